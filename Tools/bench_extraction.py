@@ -0,0 +1,78 @@
+import os
+import sys
+import time
+from playwright.sync_api import sync_playwright
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scraperv2 import RESULTS_ROWS_SELECTOR, extract_shooter_data, read_table
+from practiscore_html import parse_shooter_rows
+
+# Usage: python Tools/bench_extraction.py [results URL or saved .html file] [runs]
+# With no page given it benchmarks a synthetic 60-shooter, 10-column stage table.
+RUNS = 5
+SHOOTERS = 60
+COLUMNS = ["Place", "Name", "No.", "Class", "Division", "Time", "Hits", "Penalties", "Stage Pts", "Stage %"]
+
+
+def synthetic_stage_html():
+    header = "".join(f"<th>{c}</th>" for c in COLUMNS)
+    rows = []
+    for i in range(SHOOTERS):
+        cells = [i + 1, f"Shooter, Number {i}", i + 100, "Open", "Open", "120.00", 10 - i % 10, 0,
+                 f"{100 - i:.2f}", f"{100 - i:.2f}%"]
+        rows.append("<tr>" + "".join(f"<td>{c}</td>" for c in cells) + "</tr>")
+    return f"<html><body><h3>Synthetic Stage</h3><table><tr>{header}</tr>{''.join(rows)}</table></body></html>"
+
+
+def load(page, source):
+    if source is None:
+        page.set_content(synthetic_stage_html())
+    elif os.path.exists(source):
+        with open(source, encoding="utf-8") as f:
+            page.set_content(f.read())
+    else:
+        page.goto(source)
+        page.wait_for_selector("table tr td")
+
+
+def per_cell(page):
+    rows = page.query_selector_all(RESULTS_ROWS_SELECTOR)
+    return extract_shooter_data(rows, {})
+
+
+def batched(page):
+    return parse_shooter_rows(read_table(page), {})
+
+
+def time_runs(fn, page, runs):
+    start = time.perf_counter()
+    for _ in range(runs):
+        result = fn(page)
+    return (time.perf_counter() - start) / runs, result
+
+
+if __name__ == "__main__":
+    source = sys.argv[1] if len(sys.argv) > 1 else None
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else RUNS
+
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True)
+        page = browser.new_page()
+        load(page, source)
+
+        table = read_table(page)
+        # query rows + one query per row for its cells + one inner_text() per cell
+        per_cell_trips = 1 + len(table) + sum(len(row) for row in table)
+
+        per_cell_time, per_cell_rows = time_runs(per_cell, page, runs)
+        batched_time, batched_rows = time_runs(batched, page, runs)
+        browser.close()
+
+    print(f"📋 Table: {len(table)} rows, {sum(len(row) for row in table)} cells, {runs} run(s) each")
+    print(f"🐢 Per-cell: {per_cell_trips} round-trips, {per_cell_time * 1000:.1f} ms/page")
+    print(f"⚡ Batched:  1 round-trip, {batched_time * 1000:.1f} ms/page")
+    print(f"📈 Speedup:  {per_cell_time / batched_time:.1f}x")
+    if per_cell_rows != batched_rows:
+        print("❌ Row mismatch between per-cell and batched extraction!")
+        sys.exit(1)
+    print(f"✅ Both paths extracted the same {len(batched_rows)} shooter row(s).")
@@ -0,0 +1,137 @@
+import os
+import random
+import sqlite3
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import identity
+import migrations
+
+# Usage: python Tools/bench_identity.py [roster size] [variants]
+# Builds a synthetic roster in memory, then resolves misspelled/re-cased/nicknamed variants of
+# some of its names plus brand new names and look-alikes of roster names who are other people (a Jr/Sr,
+# a similar first name). Reports blocked resolution speed and accuracy next to the naive
+# compare-against-everyone approach (timed on a sample and scaled up).
+ROSTER = 10000
+VARIANTS = 1000
+NEW_NAMES = 500
+LOOKALIKE_NAMES = 500
+NAIVE_SAMPLE = 20
+
+SYLLABLES = ["an", "bar", "ber", "cal", "dan", "der", "el", "fin", "gar", "hal", "kin", "lan", "mar", "mer",
+             "nor", "os", "per", "ran", "ros", "sen", "son", "ston", "tal", "ter", "van", "ward", "wick", "zel"]
+FIRST_NAMES = ["Aaron", "Adam", "Andrew", "Benjamin", "Bradley", "Carl", "Christopher", "Cory", "Daniel", "David",
+               "Douglas", "Edward", "Gabriel", "Gregory", "Jacob", "James", "John", "Jonathan", "Joseph", "Kenneth",
+               "Levi", "Matthew", "Michael", "Nathan", "Nicholas", "Patrick", "Richard", "Robert", "Ryan", "Samuel",
+               "Steven", "Thomas", "Timothy", "William", "Zachary"]
+SHORT_FORMS = {full.title(): short.title() for short, full in identity.NICKNAMES.items()}
+# Someone else with nearly the same first name
+SIMILAR_FIRST = {"Christopher": "Christine", "Daniel": "Danielle", "Gabriel": "Gabriella", "Joseph": "Josephine",
+                 "Michael": "Michelle", "Ryan": "Bryan", "Samuel": "Samantha", "John": "Joan", "Carl": "Carla",
+                 "Andrew": "Drew", "Nathan": "Jonathon", "Bradley": "Brady"}
+
+
+def last_name(rng):
+    return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3))).capitalize()
+
+
+def roster(rng, size):
+    names = set()
+    while len(names) < size:
+        names.add(f"{last_name(rng)}, {rng.choice(FIRST_NAMES)}")
+    return sorted(names)
+
+
+def variant(rng, name):
+    last, first = name.split(", ")
+    kind = rng.choice(["case", "typo", "nickname", "space"])
+    if kind == "case":
+        return f"{last.lower()}, {first.upper()}"
+    if kind == "typo" and len(last) > 4:
+        i = rng.randint(2, len(last) - 2)
+        return f"{last[:i]}{last[i + 1]}{last[i]}{last[i + 2:]}, {first}"
+    if kind == "nickname" and first in SHORT_FORMS:
+        return f"{last}, {SHORT_FORMS[first]}"
+    return f"{last} , {first} "
+
+
+def lookalike(rng, name):
+    # A relative (same name plus Jr/Sr/II) or a different first name that scores close to this one
+    last, first = name.split(", ")
+    if first in SIMILAR_FIRST and rng.random() < 0.5:
+        return f"{last}, {SIMILAR_FIRST[first]}"
+    return f"{last}, {first} {rng.choice(['Jr', 'Sr', 'II'])}"
+
+
+def naive_match(names, name):
+    best = max(((identity.name_similarity(name, other), other) for other in names if other != name), default=None)
+    return best if best and identity.same_person(name, best[1]) else None
+
+
+if __name__ == "__main__":
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else ROSTER
+    variant_count = int(sys.argv[2]) if len(sys.argv) > 2 else VARIANTS
+    rng = random.Random(42)
+
+    names = roster(rng, size)
+    originals = rng.sample(names, variant_count)
+    variants = [(variant(rng, name), name) for name in originals]
+    # Newcomers: last names nobody on the roster has
+    known_last = {name.split(", ")[0] for name in names}
+    new_names = []
+    while len(new_names) < NEW_NAMES:
+        last = last_name(rng)
+        if last not in known_last:
+            new_names.append(f"{last}, {rng.choice(FIRST_NAMES)}")
+    lookalikes = [lookalike(rng, name) for name in rng.sample(names, LOOKALIKE_NAMES)]
+    lookalikes = [name for name in lookalikes if name not in set(names)]
+
+    conn = sqlite3.connect(":memory:")
+    migrations.migrate(conn)
+    conn.executemany("INSERT INTO shooters (name) VALUES (?)", [(n,) for n in names])
+    ids = dict(conn.execute("SELECT name, shooter_id FROM shooters"))
+
+    start = time.perf_counter()
+    resolver = identity.IdentityResolver(conn)
+    build = time.perf_counter() - start
+
+    def auto_match(name):
+        # IdentityResolver.match without recording the alias
+        best = {c[1] for c in resolver.candidates(name) if identity.same_person(name, c[2])}
+        return best.pop() if len(best) == 1 else None
+
+    start = time.perf_counter()
+    hits = wrong = review = missed = 0
+    for name, original in variants:
+        shooter_id = auto_match(name)
+        if shooter_id == ids[original]:
+            hits += 1
+        elif shooter_id is not None:
+            wrong += 1
+        elif any(c[1] == ids[original] for c in resolver.candidates(name)):
+            review += 1
+        else:
+            missed += 1
+    false_matches = sum(1 for name in new_names if auto_match(name) is not None)
+    lookalike_matches = sum(1 for name in lookalikes if auto_match(name) is not None)
+    blocked = time.perf_counter() - start
+    lookups = len(variants) + len(new_names) + len(lookalikes)
+
+    start = time.perf_counter()
+    for name, _ in variants[:NAIVE_SAMPLE]:
+        naive_match(names, name)
+    naive_each = (time.perf_counter() - start) / NAIVE_SAMPLE
+
+    block_sizes = sorted(len(members) for members in resolver.blocks.values())
+    print(f"👥 Roster: {size} names in {len(block_sizes)} blocks (median {block_sizes[len(block_sizes) // 2]}, "
+          f"largest {block_sizes[-1]}), built in {build * 1000:.0f} ms")
+    print(f"⚡ Blocked: {lookups} lookups in {blocked:.2f}s ({blocked / lookups * 1000:.2f} ms each)")
+    print(f"🐢 Naive:   {naive_each * 1000:.1f} ms each, ~{naive_each * lookups:.0f}s for the same lookups "
+          f"({naive_each / (blocked / lookups):.0f}x slower)")
+    print(f"🎯 Variants: {hits} matched automatically, {review} left for review, {missed} missed, "
+          f"{wrong} matched to the wrong shooter")
+    print(f"🆕 New names wrongly matched to someone: {false_matches}/{len(new_names)}")
+    print(f"👪 Relatives/similar first names wrongly matched to a roster shooter: "
+          f"{lookalike_matches}/{len(lookalikes)}")
+    conn.close()
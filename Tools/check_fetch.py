@@ -0,0 +1,189 @@
+import os
+import queue
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import async_fetch
+import page_cache
+import pipeline
+import scraperv2
+from checks import check, db_path_arg, scratch_copy
+from progress import Progress
+from fixture_server import FixtureServer, LONG_MATCH_STAGES, SHORT_MATCH_STAGES
+
+# Usage: python Tools/check_fetch.py [database]
+# Runs async_fetch.AsyncFetcher and a full pipeline import against Tools/fixture_server.py:
+# per-host concurrency cap, token-bucket pacing, retries on 503s and timeouts, 404 = missing,
+# and a stage that never loads keeps its match out of the database instead of cutting it short.
+# Also checks that stages come from the links on the overall page (no probing past the last one),
+# with the old probe only for overall pages that don't list them.
+SLOW_PAGE = 0.2
+
+
+def stage_urls(server, uuid, count):
+    return [f"{server.match_url(uuid)}?page=stage{i}-combined" for i in range(count)]
+
+
+def requests_for(server, uuid):
+    return [path for _, path in server.requests if uuid in path]
+
+
+def imported_stages(db_path, uuid):
+    conn = sqlite3.connect(db_path)
+    row = conn.execute("""
+        SELECT COUNT(st.stage_no) FROM matches m
+        LEFT JOIN stages st ON st.match_id = m.match_id AND st.stage_no > 0
+        WHERE m.practiscore_uuid = ?
+        GROUP BY m.match_id
+    """, (uuid,)).fetchone()
+    conn.close()
+    return None if row is None else row[0]
+
+
+if __name__ == "__main__":
+    db_path = db_path_arg()
+    server = FixtureServer().start()
+    ok = True
+
+    # --- Concurrency cap: 4 in flight at most, so 16 slow pages take 4 rounds ---
+    urls = stage_urls(server, "2a000000-0000-0000-0000-000000000001", LONG_MATCH_STAGES)
+    urls += stage_urls(server, "2b000000-0000-0000-0000-000000000002", 16 - LONG_MATCH_STAGES)
+    for url in urls:
+        server.add_fault(url, f"sleep:{SLOW_PAGE}")
+    fetcher = async_fetch.AsyncFetcher(concurrency=4, rate=1000, burst=1000)
+    start = time.perf_counter()
+    pages = fetcher.fetch_many(urls)
+    elapsed = time.perf_counter() - start
+    fetcher.close()
+    ok = check("all pages ok", all(p.status == "ok" for p in pages), f"{len(pages)} pages") and ok
+    ok = check("per-host cap", server.max_in_flight == 4, f"max {server.max_in_flight} in flight") and ok
+    ok = check("cap paces the batch", elapsed >= 4 * SLOW_PAGE, f"{elapsed:.2f}s for 4 rounds of {SLOW_PAGE}s") and ok
+
+    # --- Token bucket: burst of 5, then 20 per second ---
+    server.reset_counters()
+    fetcher = async_fetch.AsyncFetcher(concurrency=25, rate=20, burst=5)
+    urls = stage_urls(server, "2c000000-0000-0000-0000-000000000003", LONG_MATCH_STAGES) * 2 + \
+        stage_urls(server, "2d000000-0000-0000-0000-000000000004", 3)
+    start = time.perf_counter()
+    fetcher.fetch_many(urls)
+    elapsed = time.perf_counter() - start
+    fetcher.close()
+    times = sorted(t for t, _ in server.requests)
+    ok = check("rate limit", elapsed >= (len(urls) - 5) / 20 * 0.95,
+               f"{len(urls)} requests in {elapsed:.2f}s (≥ {(len(urls) - 5) / 20:.2f}s expected)") and ok
+    ok = check("burst", times[4] - times[0] < 0.1, f"first 5 within {times[4] - times[0]:.3f}s") and ok
+
+    # --- Retries, missing vs failed ---
+    uuid = "1e000000-0000-0000-0000-000000000005"
+    flaky, timeout, missing, down = (
+        f"{server.match_url(uuid)}?page=stage0-combined",
+        f"{server.match_url(uuid)}?page=stage1-combined",
+        f"{server.match_url(uuid)}?page=stage{SHORT_MATCH_STAGES}-combined",
+        f"{server.match_url(uuid)}?page=stage2-combined",
+    )
+    server.add_fault(flaky, "503", "503")
+    server.add_fault(timeout, "sleep:1.0")
+    server.add_fault(down, *["503"] * 10)
+    fetcher = async_fetch.AsyncFetcher(retries=3, backoff=0.05, timeout=0.3)
+    results = dict(zip(["flaky", "timeout", "missing", "down"], fetcher.fetch_many([flaky, timeout, missing, down])))
+    fetcher.close()
+    server.clear_faults()
+    ok = check("503 retried", results["flaky"].status == "ok" and results["flaky"].attempts == 3,
+               f"{results['flaky'].status} after {results['flaky'].attempts} attempts") and ok
+    ok = check("timeout retried", results["timeout"].status == "ok" and results["timeout"].attempts == 2,
+               f"{results['timeout'].status} after {results['timeout'].attempts} attempts") and ok
+    ok = check("404 is missing", results["missing"].status == "missing" and results["missing"].attempts == 1,
+               f"{results['missing'].status}, {results['missing'].attempts} attempt") and ok
+    ok = check("persistent 503 is failed", results["down"].status == "failed" and results["down"].attempts == 4,
+               f"{results['down'].status} after {results['down'].attempts} attempts ({results['down'].error})") and ok
+
+    # --- Whole imports on a scratch copy of the database ---
+    scratch = tempfile.mkdtemp()
+    scratch_db = scratch_copy(db_path, scratch)
+    stdout = sys.stdout
+    try:
+        flaky_uuid, broken_uuid = "2f000000-0000-0000-0000-000000000006", "1f000000-0000-0000-0000-000000000007"
+        server.add_fault(f"{server.match_url(flaky_uuid)}?page=stage5-combined", "503", "503")
+        server.add_fault(f"{server.match_url(broken_uuid)}?page=stage1-combined", *["503"] * 20)
+        sys.stdout = open(os.devnull, "w")
+        pipeline.run([server.match_url(flaky_uuid), server.match_url(broken_uuid)], scratch_db, venue_id=2)
+        flaky_stages, broken_stages = imported_stages(scratch_db, flaky_uuid), imported_stages(scratch_db, broken_uuid)
+        server.clear_faults()
+        pipeline.run([server.match_url(broken_uuid)], scratch_db, venue_id=2)
+        retried_stages = imported_stages(scratch_db, broken_uuid)
+
+        # --- Stage discovery: listed stages in one go vs probing ---
+        listed_uuid, linkless_uuid = "2e000000-0000-0000-0000-000000000008", "0e000000-0000-0000-0000-000000000009"
+        server.reset_counters()
+        events = queue.Queue()
+        pipeline.run([server.match_url(listed_uuid), server.match_url(linkless_uuid)], scratch_db, venue_id=2,
+                     progress=Progress(events))
+        listed_requests, linkless_requests = requests_for(server, listed_uuid), requests_for(server, linkless_uuid)
+        listed_stages, linkless_stages = imported_stages(scratch_db, listed_uuid), imported_stages(scratch_db, linkless_uuid)
+        stage_events = [e.data for e in list(events.queue) if e.kind == "stage"]
+
+        # --- Replay: a listed stage that isn't in the cache is a failure, not a missing stage ---
+        replay_uuid, cache_dir = "2b000000-0000-0000-0000-00000000000b", os.path.join(scratch, "page_cache")
+        pipeline.run([server.match_url(replay_uuid)], scratch_db, venue_id=2, cache=page_cache.PageCache(cache_dir))
+        index = sqlite3.connect(os.path.join(cache_dir, "index.db"))
+        with index:
+            index.execute("DELETE FROM pages WHERE match_uuid = ? AND page = 'stage3-combined'", (replay_uuid,))
+        index.close()
+        replay_db = scratch_copy(db_path, scratch, "replay.db")
+        pipeline.run([server.match_url(replay_uuid)], replay_db, venue_id=2, cache=page_cache.PageCache(cache_dir),
+                     replay=True)
+        replay_stages = imported_stages(replay_db, replay_uuid)
+
+        # --- An error part way through: matches already committed still get their points ---
+        done_uuid, crash_uuid = "2c000000-0000-0000-0000-00000000000c", "2d000000-0000-0000-0000-00000000000d"
+        scrape_match = scraperv2.scrape_match
+
+        def crash_on_second(fetcher, ingestor, overall_url, *args):
+            if crash_uuid in overall_url:
+                raise RuntimeError("scraper blew up")
+            return scrape_match(fetcher, ingestor, overall_url, *args)
+
+        scraperv2.scrape_match = crash_on_second
+        try:
+            pipeline.run([server.match_url(done_uuid), server.match_url(crash_uuid)], scratch_db, venue_id=2)
+            crash_error = None
+        except RuntimeError as e:
+            crash_error = e
+        finally:
+            scraperv2.scrape_match = scrape_match
+        conn = sqlite3.connect(scratch_db)
+        unscored = conn.execute("""
+            SELECT COUNT(*), COUNT(sc.wyco_points) FROM scores sc JOIN matches m ON m.match_id = sc.match_id
+            WHERE m.practiscore_uuid = ? AND sc.stage_no = 0
+        """, (done_uuid,)).fetchone()
+        conn.close()
+    finally:
+        sys.stdout = stdout
+        shutil.rmtree(scratch)
+    ok = check("flaky stage imported", flaky_stages == LONG_MATCH_STAGES, f"{flaky_stages} of {LONG_MATCH_STAGES} stages") and ok
+    ok = check("failing stage keeps match out", broken_stages is None, "not imported" if broken_stages is None
+               else f"imported with {broken_stages} stages") and ok
+    ok = check("next run imports it", retried_stages == SHORT_MATCH_STAGES,
+               f"{retried_stages} of {SHORT_MATCH_STAGES} stages") and ok
+    ok = check("listed stages imported", listed_stages == LONG_MATCH_STAGES,
+               f"{listed_stages} of {LONG_MATCH_STAGES} stages") and ok
+    ok = check("no probe past the last stage", len(listed_requests) == LONG_MATCH_STAGES + 1,
+               f"{len(listed_requests)} requests for the overall page + {LONG_MATCH_STAGES} stages") and ok
+    ok = check("stage N of M", [(e["stage"], e["stages"]) for e in stage_events[:LONG_MATCH_STAGES]]
+               == [(n, LONG_MATCH_STAGES) for n in range(1, LONG_MATCH_STAGES + 1)],
+               f"{sum(e['stages'] == LONG_MATCH_STAGES for e in stage_events)} stage events with the total known") and ok
+    ok = check("replay with a stage missing from the cache", replay_stages is None,
+               "not imported" if replay_stages is None else f"imported with {replay_stages} stages") and ok
+    ok = check("error mid-run still scores committed matches", crash_error is not None and unscored[0] > 0
+               and unscored[0] == unscored[1], f"{unscored[1]} of {unscored[0]} overall scores have WYCO points, "
+               f"error {'re-raised' if crash_error else 'lost'}") and ok
+    ok = check("unlisted stages probed", linkless_stages == LONG_MATCH_STAGES
+               and len(linkless_requests) > LONG_MATCH_STAGES + 1,
+               f"{linkless_stages} stages in {len(linkless_requests)} requests") and ok
+
+    server.stop()
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,54 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import practiscore_html
+from checks import check, compare_rows
+
+# Usage: python Tools/check_parser.py
+# Parses the saved results pages in Tools/fixtures/ with practiscore_html (no network, no browser) and checks
+# every row. Save a new page there when PractiScore changes its markup and add what it should parse to.
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+OVERALL_TITLE = "WYCO Laramie PRS Steel Challenge - 2025-06-14"
+OVERALL_STAGES = [0, 1, 2]
+OVERALL_ROWS = [
+    ("Rizzo, TJ", 1, 100.0, 285.0, {"class": "Open", "division": "Open", "extra": {"no.": "12"}}),
+    ("Gaines, Christopher", 2, 88.25, 251.5, {"class": "Open", "division": "Open", "extra": {"no.": "7"}}),
+    ("Priest, Jake", 3, 70.09, 199.75, {"class": "Tactical", "division": "Tactical", "extra": {"no.": "31"}}),
+    ("Van Duine, Ryan", 4, 0.0, 0.0, {"class": "Open", "division": "Open"}),
+]
+STAGE_ROWS = [
+    ("Rizzo, TJ", 1, 100.0, 100.0, {"class": "Open", "division": "Open", "time": 88.41, "hits": 10,
+                                    "penalties": 0.0, "extra": {"no.": "12"}}),
+    ("Priest, Jake", 2, 80.0, 80.0, {"class": "Tactical", "division": "Tactical", "time": 104.9, "hits": 8,
+                                     "penalties": 1.0, "extra": {"no.": "31"}}),
+    # "DNF" isn't a time, so it's kept as text; "-" is an empty cell
+    ("Gaines, Christopher", 3, 60.0, 60.0, {"class": "Open", "division": "Open", "hits": 6,
+                                            "extra": {"no.": "7", "time": "DNF"}}),
+]
+
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.read()
+
+
+if __name__ == "__main__":
+    ok = True
+
+    title, rows, stages = practiscore_html.parse_overall_page(read_fixture("overall_results.html"))
+    ok = check("overall title", title == OVERALL_TITLE, repr(title)) and ok
+    ok = check("stage list", stages == OVERALL_STAGES, str(stages)) and ok
+    ok = compare_rows("overall rows", OVERALL_ROWS, rows) and ok
+
+    ok = compare_rows("stage rows", STAGE_ROWS,
+                      practiscore_html.parse_results_page(read_fixture("stage_results.html"))) and ok
+
+    try:
+        practiscore_html.parse_results_page("<html><body><p>Loading results…</p></body></html>")
+        ok = check("page without a table", False, "parsed instead of asking for the browser") and ok
+    except practiscore_html.StaticParseError:
+        ok = check("page without a table", True, "StaticParseError, so the browser gets a turn") and ok
+
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,60 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import classify_shooters
+import match_detail
+import scoring
+import shooter_stats
+import standings
+from checks import db_path_arg, memory_copy
+
+# Usage: python Tools/check_query_plans.py [database]
+# Migrates an in-memory copy of the database and checks every hot lookup is served by an index.
+
+# The queries the code runs, taken from the modules that run them. Incremental forms (one match, one shooter):
+# a full rebuild reads everything anyway
+HOT_QUERIES = {
+    "scraper: stages of a match": (
+        "SELECT stage_no FROM stages WHERE match_id = ?", (1,)),
+    "scraper: match by name": (
+        "SELECT match_id FROM matches WHERE match_name = ?", ("x",)),
+    "points: new matches and their shooters' history": scoring.overall_scores_query([1]),
+    "classify: scores of new matches": classify_shooters.history_query(match_ids=[1]),
+    "classify: shooter history": classify_shooters.history_query(shooter_ids=[1]),
+    "standings: rebuild": (standings.STANDINGS_QUERY, ()),
+    "Match_Scores: whole match": (match_detail.RESULTS_QUERY, (1,)),
+    "Individual_Shooter_Stats: results of a shooter": shooter_stats.results_query([1]),
+    "Individual_Shooter_Stats: summary row": (shooter_stats.SUMMARY_QUERY, (1, 0)),
+}
+
+# Tables a query walks on purpose: everyone on the leaderboard is a shooters row
+WHOLE_TABLES = {
+    "standings: rebuild": {"s"},
+}
+
+
+def full_scans(conn, sql, params, whole=()):
+    plan = conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+    # "SCAN t" without "USING ... INDEX" walks the whole table; "SCAN (subquery-n)" reads rows already built
+    scans = [detail for _, _, _, detail in plan if detail.startswith("SCAN") and "INDEX" not in detail]
+    return [detail for detail in scans if not detail.startswith("SCAN (") and detail.split()[1] not in whole]
+
+
+if __name__ == "__main__":
+    conn = memory_copy(db_path_arg())
+
+    failures = 0
+    for label, (sql, params) in HOT_QUERIES.items():
+        scans = full_scans(conn, sql, params, WHOLE_TABLES.get(label, ()))
+        if scans:
+            failures += 1
+            print(f"❌ {label}: {'; '.join(scans)}")
+        else:
+            print(f"✅ {label}")
+
+    conn.close()
+    if failures:
+        print(f"\n❌ {failures} hot quer{'y' if failures == 1 else 'ies'} still scan a whole table.")
+        sys.exit(1)
+    print("\n🎯 Every hot query uses an index.")
@@ -0,0 +1,51 @@
+import os
+import shutil
+import sqlite3
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import migrations
+
+# Shared by the Tools/verify_* and check_* scripts: copies of the database to work on, and ✅/❌ reporting.
+# The database given on the command line is only ever read.
+DB_PATH = "allshooters_prs.db"
+
+
+def db_path_arg():
+    return sys.argv[1] if len(sys.argv) > 1 else DB_PATH
+
+
+def memory_copy(db_path=DB_PATH):
+    # In-memory copy, migrated to the current schema
+    source = sqlite3.connect(db_path)
+    conn = sqlite3.connect(":memory:")
+    source.backup(conn)
+    source.close()
+    migrations.migrate(conn)
+    return conn
+
+
+def scratch_copy(db_path, directory, name="scratch.db"):
+    # File copy, for code that opens the database by path itself (pipeline.run)
+    path = os.path.join(directory, name)
+    shutil.copy(db_path, path)
+    return path
+
+
+def check(label, passed, detail=""):
+    print(f"{'✅' if passed else '❌'} {label}{': ' + detail if detail else ''}")
+    return passed
+
+
+def snapshot(conn, queries):
+    # queries: name -> SELECT with an ORDER BY, so two snapshots compare row for row
+    return {name: conn.execute(query).fetchall() for name, query in queries.items()}
+
+
+def compare_rows(label, expected, actual, left="expected", right="actual"):
+    mismatches = [(e, a) for e, a in zip(expected, actual) if e != a]
+    if len(expected) != len(actual):
+        mismatches.append((f"{len(expected)} rows", f"{len(actual)} rows"))
+    for e, a in mismatches[:10]:
+        print(f"   ❌ {label}: {left} {e} vs {right} {a}")
+    return check(label, not mismatches, f"{len(expected)} rows, {len(mismatches)} mismatch(es)")
@@ -0,0 +1,144 @@
+import http.server
+import sys
+import threading
+import time
+import urllib.parse
+from collections import defaultdict
+
+# A stand-in for PractiScore's HTML results pages, for checking the scraper without the real site.
+#   /results/html/<uuid>                         overall results (title, stage links, table)
+#   /results/html/<uuid>?page=stage<N>-combined  stage N+1, or 404 past the last stage
+# Matches whose UUID starts with "1" have 3 stages, the rest 11. Overall pages link every stage, except
+# for UUIDs starting with "0" (like older results pages), which make the scraper probe. Faults can be queued per page:
+# each request to it takes the next one ("503", "sleep:<seconds>"), then it serves normally.
+# Run on its own: python Tools/fixture_server.py [port]
+SHOOTERS = 8
+SHORT_MATCH_STAGES = 3
+LONG_MATCH_STAGES = 11
+
+
+def stage_count(uuid):
+    return SHORT_MATCH_STAGES if uuid.startswith("1") else LONG_MATCH_STAGES
+
+
+def results_table(kind, shooters=SHOOTERS):
+    head = (f"<tr><th>Place</th><th>Name</th><th>{kind} Pts</th><th>{kind} %</th>"
+            f"<th>Time</th><th>A</th><th>C</th><th>D</th><th>M</th><th>NS</th><th>Proc</th><th>Class</th></tr>")
+    rows = "".join(
+        f"<tr><td>{i + 1}</td><td>Shooter, No{i}</td><td>{100 - i * 3:.1f}</td><td>{100 - i * 3:.2f}%</td>"
+        f"<td>{100 + i}.5</td><td>{10 - i}</td><td>{i}</td><td>{i % 3}</td><td>{i % 2}</td><td>0</td>"
+        f"<td>{i % 4 // 3}</td><td>{'ABC'[i % 3]}</td></tr>"
+        for i in range(shooters)
+    )
+    return f"<table>{head}{rows}</table>"
+
+
+def page_html(uuid, page):
+    stages = stage_count(uuid)
+    links = "".join(
+        f'<a href="/results/html/{uuid}?page=stage{i}-combined">Stage {i + 1}</a> ' for i in range(stages)
+    )
+    if page == "overall-combined":
+        title = f"Laramie Test {uuid[:4]} - 2025-09-{int(uuid[0], 16) % 28 + 1:02d}"
+        stage_list = "" if uuid.startswith("0") else f"<div class='stages'>{links}</div>"
+        return f"<html><body><h3>{title}</h3>{stage_list}{results_table('Match')}</body></html>"
+    if page.startswith("stage") and page.endswith("-combined"):
+        number = page[len("stage"):-len("-combined")]
+        if number.isdigit() and int(number) < stages:
+            return f"<html><body><h3>Stage {int(number) + 1}</h3>{links}{results_table('Stage')}</body></html>"
+    return None
+
+
+class FixtureServer:
+    def __init__(self, port=0):
+        self.faults = defaultdict(list)  # "/results/html/<uuid>?page=..." -> queued faults
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.requests = []  # (time, path)
+        handler = self.handler()
+        self.httpd = http.server.ThreadingHTTPServer(("127.0.0.1", port), handler)
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    def match_url(self, uuid):
+        return f"{self.base_url}/results/html/{uuid}"
+
+    def add_fault(self, url_or_path, *faults):
+        parsed = urllib.parse.urlparse(url_or_path)
+        key = parsed.path + (f"?{parsed.query}" if parsed.query else "")
+        with self.lock:
+            self.faults[key].extend(faults)
+
+    def clear_faults(self):
+        with self.lock:
+            self.faults.clear()
+
+    def reset_counters(self):
+        with self.lock:
+            self.max_in_flight = 0
+            self.requests = []
+
+    def handler(self):
+        server = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                with server.lock:
+                    server.in_flight += 1
+                    server.max_in_flight = max(server.max_in_flight, server.in_flight)
+                    server.requests.append((time.monotonic(), self.path))
+                    queued = server.faults.get(self.path)
+                    fault = queued.pop(0) if queued else None
+                try:
+                    self.serve(fault)
+                finally:
+                    with server.lock:
+                        server.in_flight -= 1
+
+            def serve(self, fault):
+                if fault == "503":
+                    self.send_response(503)
+                    self.end_headers()
+                    return
+                if fault and fault.startswith("sleep:"):
+                    time.sleep(float(fault.split(":", 1)[1]))
+                parsed = urllib.parse.urlparse(self.path)
+                uuid = parsed.path.rsplit("/", 1)[-1]
+                page = urllib.parse.parse_qs(parsed.query).get("page", ["overall-combined"])[0]
+                body = page_html(uuid, page)
+                if body is None:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html")
+                self.end_headers()
+                try:
+                    self.wfile.write(body.encode())
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # the client gave up waiting (a timeout test)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+if __name__ == "__main__":
+    server = FixtureServer(int(sys.argv[1]) if len(sys.argv) > 1 else 8766)
+    print(f"🧪 Fixture pages at {server.base_url}/results/html/<uuid>")
+    server.httpd.serve_forever()
@@ -0,0 +1,129 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import classify_shooters
+from checks import check, compare_rows, db_path_arg, memory_copy, snapshot
+
+# Usage: python Tools/verify_classification.py [database]
+# Runs the old per-shooter classification loop and the vectorized classify_shooters on two
+# in-memory copies of the database and checks every shooter ends up with the same class.
+# Then hides the newest match, classifies, brings it back and checks the incremental
+# classify_matches lands on the same classes and stored state as a full run.
+A_THRESHOLD = classify_shooters.A_THRESHOLD
+B_THRESHOLD = classify_shooters.B_THRESHOLD
+class_rank = classify_shooters.class_rank
+
+
+# --- classify_shooters.py before vectorizing, verbatim apart from prints and the stage_no column ---
+def determine_initial_class(scores):
+    first_three = scores[:3]
+    if len(first_three) < 3:
+        return "Unclassified"
+    avg = sum(first_three) / 3
+    if avg <= B_THRESHOLD:
+        return "C"
+    elif avg <= A_THRESHOLD:
+        return "B"
+    else:
+        return "A"
+
+
+def evaluate_class_promotion(existing_class, all_percentages):
+    for i in range(len(all_percentages) - 2):
+        window = all_percentages[i:i+3]
+        if existing_class == "C" and all(p > B_THRESHOLD for p in window):
+            return "B"
+        elif existing_class == "B" and all(p > A_THRESHOLD for p in window):
+            return "A"
+    return existing_class
+
+
+def legacy_classify(conn):
+    cursor = conn.cursor()
+    shooter_ids = cursor.execute("""
+        SELECT shooter_id, name,
+            CASE
+                WHEN classification IS NULL OR TRIM(classification) = '' THEN 'Unclassified'
+                ELSE classification
+            END AS classification
+        FROM shooters
+        WHERE wyco_number IS NOT NULL AND membership_active = 1
+    """).fetchall()
+
+    for shooter_id, name, current_class in shooter_ids:
+        percentages = cursor.execute("""
+            SELECT sc.wyco_points
+            FROM scores sc
+            JOIN matches m ON sc.match_id = m.match_id
+            WHERE sc.shooter_id = ? AND sc.stage_no = 0 AND sc.wyco_points > 0
+            ORDER BY m.match_date ASC
+        """, (shooter_id,)).fetchall()
+
+        percentages = [p[0] for p in percentages if p[0] is not None]
+
+        if len(percentages) < 3:
+            if current_class != "Unclassified":
+                cursor.execute(
+                    "UPDATE shooters SET classification = 'Unclassified' WHERE shooter_id = ?",
+                    (shooter_id,)
+                )
+            continue
+
+        initial_class = determine_initial_class(percentages)
+        final_class = evaluate_class_promotion(initial_class, percentages)
+
+        if class_rank[final_class] > class_rank[current_class]:
+            cursor.execute(
+                "UPDATE shooters SET classification = ? WHERE shooter_id = ?",
+                (final_class, shooter_id)
+            )
+    conn.commit()
+
+
+CLASSES = {
+    "classes": "SELECT shooter_id, name, classification FROM shooters ORDER BY shooter_id",
+    "state": "SELECT * FROM classification_state ORDER BY shooter_id",
+}
+
+
+def copy_db(db_path, reset):
+    conn = memory_copy(db_path)
+    if reset:
+        # Start everyone from scratch so initial classes and promotions all get exercised
+        conn.execute("UPDATE shooters SET classification = ''")
+        conn.commit()
+    return conn
+
+
+if __name__ == "__main__":
+    db_path = db_path_arg()
+    ok = True
+    for reset in (False, True):
+        loop_conn = copy_db(db_path, reset)
+        legacy_classify(loop_conn)
+        vector_conn = copy_db(db_path, reset)
+        classify_shooters.classify_shooters(vector_conn)
+
+        label = "from scratch" if reset else "from current classes"
+        ok = compare_rows(label, snapshot(loop_conn, CLASSES)["classes"], snapshot(vector_conn, CLASSES)["classes"],
+                          "loop", "vectorized") and ok
+
+    full_conn = copy_db(db_path, reset=True)
+    classify_shooters.classify_shooters(full_conn)
+
+    inc_conn = copy_db(db_path, reset=True)
+    latest = inc_conn.execute("SELECT match_id FROM matches ORDER BY match_date DESC, match_id DESC").fetchone()[0]
+    hidden = inc_conn.execute("SELECT score_id, wyco_points FROM scores WHERE match_id = ?", (latest,)).fetchall()
+    inc_conn.execute("UPDATE scores SET wyco_points = 0 WHERE match_id = ?", (latest,))
+    classify_shooters.classify_shooters(inc_conn)
+    inc_conn.executemany("UPDATE scores SET wyco_points = ? WHERE score_id = ?", [(p, i) for i, p in hidden])
+    classify_shooters.classify_matches(inc_conn, [latest])
+
+    full, incremental = snapshot(full_conn, CLASSES), snapshot(inc_conn, CLASSES)
+    ok = compare_rows(f"incremental classes (match {latest})", full["classes"], incremental["classes"],
+                      "full", "incremental") and ok
+    state_ok = full["state"] == incremental["state"]
+    ok = check(f"incremental (match {latest})", state_ok,
+               f"stored classification_state {'matches' if state_ok else 'differs from'} a full run") and ok
+    sys.exit(0 if ok else 1)
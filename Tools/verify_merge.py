@@ -0,0 +1,129 @@
+import os
+import sqlite3
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import classify_shooters
+import merge_shooters
+import scoring
+import shooter_stats
+import standings
+from checks import check, db_path_arg, memory_copy, snapshot
+
+# Usage: python Tools/verify_merge.py [database]
+# Works on an in-memory copy. Merges shooters who shot the same matches (so scores and
+# achievements collide), a chain and a plain pair, then checks nothing points at a deleted
+# shooter, every collision was resolved, the incremental refresh matches a full one, and a
+# merge that fails part way leaves the database untouched.
+SNAPSHOTS = {
+    "shooters": "SELECT * FROM shooters ORDER BY shooter_id",
+    "scores": "SELECT * FROM scores ORDER BY score_id",
+    "achievements": "SELECT * FROM achievements ORDER BY id",
+    "shooter_aliases": "SELECT alias, shooter_id, source FROM shooter_aliases ORDER BY alias",
+    "classification_state": "SELECT * FROM classification_state ORDER BY shooter_id",
+    "standings": "SELECT * FROM standings ORDER BY rank",
+    "shooter_stats": "SELECT * FROM shooter_stats ORDER BY shooter_id, year",
+}
+
+# Tables with a shooter_id that must name an existing shooter after a merge
+REFERENCING = ["scores", "achievements", "shooter_aliases", "classification_history",
+               "classification_state", "standings", "shooter_stats"]
+
+
+def full_refresh(conn):
+    scoring.recalculate(conn)
+    classify_shooters.classify_shooters(conn)
+    standings.refresh(conn)
+    shooter_stats.refresh(conn)
+
+
+def pick_mapping(conn):
+    # Members who shot the same match (their Overall rows collide), ones holding achievements, a chain and a plain pair
+    busy = [row[0] for row in conn.execute("""
+        SELECT sc.shooter_id FROM scores sc
+        JOIN shooters s ON s.shooter_id = sc.shooter_id
+        WHERE sc.stage_no = 0 AND s.wyco_number IS NOT NULL AND s.membership_active = 1
+        GROUP BY sc.shooter_id ORDER BY COUNT(*) DESC, sc.shooter_id LIMIT 4
+    """)]
+    decorated = [row[0] for row in conn.execute("""
+        SELECT shooter_id FROM achievements
+        WHERE shooter_id IN (SELECT shooter_id FROM shooters) AND shooter_id NOT IN ({})
+        GROUP BY shooter_id ORDER BY COUNT(*) DESC, shooter_id LIMIT 2
+    """.format(','.join(map(str, busy))))]
+    rest = [row[0] for row in conn.execute("SELECT shooter_id FROM shooters ORDER BY shooter_id")
+            if row[0] not in busy + decorated]
+    mapping = {busy[1]: busy[0], busy[2]: busy[1], busy[3]: busy[0]}  # busy[2] → busy[1] → busy[0]
+    mapping[decorated[1]] = decorated[0]
+    mapping[rest[-1]] = rest[0]
+    return mapping
+
+
+if __name__ == "__main__":
+    conn = memory_copy(db_path_arg())
+    full_refresh(conn)
+    mapping = pick_mapping(conn)
+    resolved = merge_shooters.resolve_mapping(mapping)
+    print(f"🔀 Merging {resolved}")
+
+    # --- A merge that fails on its last statement changes nothing ---
+    before = snapshot(conn, SNAPSHOTS)
+    last = max(resolved)
+    conn.execute(f"""
+        CREATE TEMP TRIGGER fail_merge BEFORE DELETE ON shooters WHEN old.shooter_id = {last}
+        BEGIN SELECT RAISE(ABORT, 'forced failure'); END
+    """)
+    try:
+        merge_shooters.merge(conn, mapping)
+        ok = check("forced failure", False, "merge did not raise")
+    except sqlite3.IntegrityError:
+        after = snapshot(conn, SNAPSHOTS)
+        unchanged = [table for table in SNAPSHOTS if before[table] == after[table]]
+        ok = check("forced failure rolls back", len(unchanged) == len(SNAPSHOTS),
+                   f"{len(unchanged)}/{len(SNAPSHOTS)} tables unchanged")
+    conn.execute("DROP TRIGGER temp.fail_merge")
+
+    try:
+        merge_shooters.merge(conn, {-1: last})
+        ok = check("unknown shooter", False, "merge did not raise") and ok
+    except merge_shooters.MergeError as e:
+        ok = check("unknown shooter refused", True, str(e)) and ok
+
+    # --- The real merge ---
+    names = dict(conn.execute("SELECT shooter_id, name FROM shooters"))
+    scores_before = conn.execute("SELECT COUNT(*) FROM scores").fetchone()[0]
+    repeats_before = conn.execute("""
+        SELECT COUNT(*) - COUNT(DISTINCT shooter_id || '-' || match_id || '-' || stage_no) FROM scores
+    """).fetchone()[0]
+    summary = merge_shooters.merge(conn, mapping)
+    print(f"📋 {summary}")
+
+    ok = check("duplicates deleted", summary.shooters == len(resolved),
+               f"{summary.shooters} of {len(resolved)}") and ok
+    for table in REFERENCING:
+        dangling = conn.execute(f"""
+            SELECT COUNT(*) FROM {table} WHERE shooter_id IN ({','.join(map(str, resolved))})
+        """).fetchone()[0]
+        ok = check(f"{table} rows of merged shooters", dangling == 0, f"{dangling} left") and ok
+    scores_after = conn.execute("SELECT COUNT(*) FROM scores").fetchone()[0]
+    ok = check("score rows", scores_after == scores_before - summary.score_conflicts,
+               f"{scores_before} - {summary.score_conflicts} conflicts = {scores_after}") and ok
+    repeats_after = conn.execute("""
+        SELECT COUNT(*) - COUNT(DISTINCT shooter_id || '-' || match_id || '-' || stage_no) FROM scores
+    """).fetchone()[0]
+    ok = check("no new repeat rows", repeats_after <= repeats_before,
+               f"{repeats_before} before, {repeats_after} after") and ok
+    aliases = dict(conn.execute("SELECT alias, shooter_id FROM shooter_aliases WHERE source = 'merge'"))
+    ok = check("merge aliases", all(aliases.get(names[dup]) == primary for dup, primary in resolved.items()),
+               f"{len(aliases)} recorded") and ok
+    ok = check("foreign keys", not conn.execute("PRAGMA foreign_key_check").fetchall()) and ok
+
+    # --- Incremental refresh gives what a full refresh would ---
+    incremental = snapshot(conn, SNAPSHOTS)
+    full_refresh(conn)
+    full = snapshot(conn, SNAPSHOTS)
+    for table in ["shooters", "scores", "classification_state", "standings", "shooter_stats"]:
+        same = incremental[table] == full[table]
+        ok = check(f"{table} after incremental refresh", same, "matches full refresh" if same else "differs") and ok
+
+    conn.close()
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,90 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import scoring
+from checks import compare_rows, db_path_arg, memory_copy, snapshot
+
+# Usage: python Tools/verify_points.py [database]
+# Runs the old per-row pointsv2 loop and the scoring engine on two in-memory copies
+# of the database and checks every scores/shooters wyco_points value comes out identical.
+# Then wipes the newest match's points and checks an incremental recalculate restores them.
+POINTS = {
+    "scores": "SELECT score_id, wyco_points, typeof(wyco_points) FROM scores ORDER BY score_id",
+    "shooters": "SELECT shooter_id, wyco_points, typeof(wyco_points) FROM shooters ORDER BY shooter_id",
+}
+
+
+def legacy_recalculate(conn):
+    # pointsv2.py before the set-based rewrite, verbatim apart from prints and the stage_no column
+    cursor = conn.cursor()
+    match_ids = cursor.execute("SELECT match_id FROM matches").fetchall()
+    for (match_id,) in match_ids:
+        cursor.execute("""
+            SELECT MAX(points)
+            FROM scores
+            WHERE match_id = ? AND stage_no = 0
+        """, (match_id,))
+        top_score = cursor.fetchone()[0]
+
+        if not top_score or top_score == 0:
+            continue
+
+        cursor.execute("""
+            SELECT score_id, points
+            FROM scores
+            WHERE match_id = ? AND stage_no = 0
+        """, (match_id,))
+        for score_id, points in cursor.fetchall():
+            wyco = round((points / top_score) * 100, 2) if points else 0
+            cursor.execute("UPDATE scores SET wyco_points = ? WHERE score_id = ?", (wyco, score_id))
+    conn.commit()
+
+    cursor.execute("SELECT shooter_id FROM shooters WHERE wyco_number IS NOT NULL AND membership_active = 1")
+    shooter_ids = [row[0] for row in cursor.fetchall()]
+    for shooter_id in shooter_ids:
+        cursor.execute("""
+            SELECT m.venue_id, MAX(s.wyco_points)
+            FROM scores s
+            JOIN matches m ON s.match_id = m.match_id
+            WHERE s.shooter_id = ? AND s.stage_no = 0 AND m.venue_id IS NOT NULL
+            GROUP BY m.venue_id
+        """, (shooter_id,))
+        top_scores = [row[1] for row in cursor.fetchall() if row[1] is not None]
+        top_3 = sorted(top_scores, reverse=True)[:3]
+        total = round(sum(top_3), 2)
+        cursor.execute("UPDATE shooters SET wyco_points = ? WHERE shooter_id = ?", (total, shooter_id))
+    conn.commit()
+
+
+def compare(label, expected, actual):
+    return compare_rows(label, expected, actual, "loop", "engine")
+
+
+if __name__ == "__main__":
+    db_path = db_path_arg()
+
+    loop_conn = memory_copy(db_path)
+    legacy_recalculate(loop_conn)
+    loop = snapshot(loop_conn, POINTS)
+
+    set_conn = memory_copy(db_path)
+    scoring.recalculate(set_conn)
+    engine = snapshot(set_conn, POINTS)
+
+    ok = compare("scores.wyco_points", loop["scores"], engine["scores"])
+    ok = compare("shooters.wyco_points", loop["shooters"], engine["shooters"]) and ok
+
+    latest = set_conn.execute("SELECT MAX(match_id) FROM matches").fetchone()[0]
+    set_conn.execute("UPDATE scores SET wyco_points = NULL WHERE match_id = ?", (latest,))
+    set_conn.execute("""
+        UPDATE shooters SET wyco_points = NULL
+        WHERE shooter_id IN (SELECT shooter_id FROM scores WHERE match_id = ?)
+        AND wyco_number IS NOT NULL AND membership_active = 1
+    """, (latest,))
+    scoring.recalculate(set_conn, [latest])
+    incremental = snapshot(set_conn, POINTS)
+
+    ok = compare(f"incremental scores.wyco_points (match {latest})", loop["scores"], incremental["scores"]) and ok
+    ok = compare(f"incremental shooters.wyco_points (match {latest})", loop["shooters"], incremental["shooters"]) and ok
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,112 @@
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import shooter_stats
+from checks import db_path_arg, memory_copy
+
+# Usage: python Tools/verify_shooter_stats.py [database]
+# Works out every shooter's stats summary (all years and each year) the way
+# pages/Individual_Shooter_Stats.py used to and checks the shooter_stats table agrees,
+# after a full refresh, after a first import into an empty table and through the on-the-fly fallback.
+# Averages and year lists compare as displayed.
+
+
+def legacy_summary(conn, name, year):
+    # The page before shooter_stats, verbatim apart from the Streamlit calls and the stage_no column
+    df = pd.read_sql_query("""
+        SELECT m.match_name, sc.place, sc.points, sc.percentage, sc.wyco_points, m.match_date
+        FROM scores sc
+        JOIN matches m ON sc.match_id = m.match_id
+        JOIN shooters s ON sc.shooter_id = s.shooter_id
+        WHERE s.name = ?
+        AND sc.stage_no = 0
+    """, conn, params=(name,))
+    df['match_date'] = pd.to_datetime(df['match_date'], errors='coerce')
+    df.dropna(subset=['match_date'], inplace=True)
+    df = df[(df['percentage'] > 0) & (df['points'] > 0)]
+    df.sort_values("match_date", inplace=True)
+    if year != shooter_stats.ALL_YEARS:
+        df = df[df['match_date'].dt.year == year]
+    if df.empty:
+        return None
+    summary = {
+        "matches": len(df),
+        "avg_percentage": f"{df['percentage'].mean():.2f}",
+        "avg_place": f"{df['place'].mean():.1f}",
+        "best_percentage": (df.loc[df['percentage'].idxmax(), 'percentage'], df.loc[df['percentage'].idxmax(), 'match_name']),
+        "best_points": (df.loc[df['points'].idxmax(), 'points'], df.loc[df['points'].idxmax(), 'match_name']),
+        "best_place": (df.loc[df['place'].idxmin(), 'place'], df.loc[df['place'].idxmin(), 'match_name']),
+    }
+    if df['wyco_points'].notna().any():
+        summary["best_wyco"] = (df.loc[df['wyco_points'].idxmax(), 'wyco_points'], df.loc[df['wyco_points'].idxmax(), 'match_name'])
+    return summary
+
+
+def legacy_years(conn, name):
+    # Years the page can show a summary for
+    df = pd.read_sql_query("""
+        SELECT m.match_date FROM scores sc
+        JOIN matches m ON sc.match_id = m.match_id
+        JOIN shooters s ON sc.shooter_id = s.shooter_id
+        WHERE s.name = ? AND sc.stage_no = 0 AND sc.percentage > 0 AND sc.points > 0
+    """, conn, params=(name,))
+    return sorted(pd.to_datetime(df['match_date'], errors='coerce').dropna().dt.year.unique().tolist())
+
+
+def table_summary(conn, shooter_id, year):
+    stats = shooter_stats.load(conn, shooter_id, year)
+    if stats is None:
+        return None
+    summary = {
+        "matches": int(stats["matches"]),
+        "avg_percentage": f"{stats['avg_percentage']:.2f}",
+        "avg_place": f"{stats['avg_place']:.1f}",
+    }
+    for best in shooter_stats.BESTS:
+        if pd.notna(stats[best]):
+            value = int(stats[best]) if best == "best_place" else stats[best]
+            summary[best] = (value, stats[f"{best}_match"])
+    return summary
+
+
+def check(conn, label, shooters, years):
+    mismatches = 0
+    for shooter_id, name in shooters:
+        for year in years:
+            expected, actual = legacy_summary(conn, name, year), table_summary(conn, shooter_id, year)
+            if expected != actual:
+                mismatches += 1
+                if mismatches <= 5:
+                    print(f"   ❌ {name} {year}: page {expected} vs table {actual}")
+        expected, actual = legacy_years(conn, name), shooter_stats.years(conn, shooter_id)
+        if expected != actual:
+            mismatches += 1
+            if mismatches <= 5:
+                print(f"   ❌ {name} years: page {expected} vs table {actual}")
+    print(f"{'✅' if not mismatches else '❌'} {label}: {len(shooters) * (len(years) + 1)} summaries, {mismatches} mismatch(es)")
+    return not mismatches
+
+
+if __name__ == "__main__":
+    conn = memory_copy(db_path_arg())
+
+    shooters = conn.execute("SELECT shooter_id, name FROM shooters ORDER BY shooter_id").fetchall()
+    years = [shooter_stats.ALL_YEARS, 2024, 2025]
+
+    latest = conn.execute("SELECT MAX(match_id) FROM matches").fetchone()[0]
+
+    ok = check(conn, "on-the-fly (empty table)", shooters[:40], years)
+    # The first import into the empty table has to leave everyone else with stats too
+    shooter_stats.refresh_matches(conn, [latest])
+    ok = check(conn, f"first import (match {latest}, empty table)", shooters, years) and ok
+    shooter_stats.refresh(conn)
+    ok = check(conn, "shooter_stats table", shooters, years) and ok
+
+    conn.execute("DELETE FROM shooter_stats WHERE shooter_id IN (SELECT shooter_id FROM scores WHERE match_id = ?)", (latest,))
+    shooter_stats.refresh_matches(conn, [latest])
+    ok = check(conn, f"incremental refresh (match {latest})", shooters, years) and ok
+    conn.close()
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,124 @@
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import merge_shooters
+import pipeline
+import practiscore_html
+import stage_results
+from checks import check, db_path_arg, scratch_copy
+from fixture_server import FixtureServer, LONG_MATCH_STAGES, SHOOTERS
+
+# Usage: python Tools/verify_stage_results.py [database]
+# Imports a fixture match (Tools/fixture_server.py) into a scratch copy of the database and checks that
+# every results column lands in stage_results, that detail rows follow their scores through a merge and
+# a delete, that hit rates add up, and that the Parquet export reads back the same as load().
+MATCH_UUID = "2a000000-0000-0000-0000-00000000000a"
+PRS_TABLE = [
+    ["Place", "Name", "No.", "Class", "Division", "Time", "Hits", "Penalties", "Stage Pts", "Stage %"],
+    ["1", "Shooter, Prs", "101", "Open", "Open", "118.25", "9", "1", "90.00", "100.00%"],
+]
+
+
+def fixture_row(i):
+    # What Tools/fixture_server.results_table puts in row i
+    return {"time": 100 + i + 0.5, "a": 10 - i, "c": i, "d": i % 3, "misses": i % 2, "no_shoots": 0,
+            "procedurals": i % 4 // 3, "class": "ABC"[i % 3]}
+
+
+if __name__ == "__main__":
+    ok = True
+
+    # --- Parser: typed fields, unknown columns kept as text ---
+    name, place, percentage, points, detail = practiscore_html.parse_shooter_rows(PRS_TABLE, {})[0]
+    expected = {"class": "Open", "division": "Open", "time": 118.25, "hits": 9, "penalties": 1.0,
+                "extra": {"no.": "101"}}
+    ok = check("PRS columns parsed", detail == expected, str(detail)) and ok
+
+    scratch = tempfile.mkdtemp()
+    scratch_db = scratch_copy(db_path_arg(), scratch)
+    server = FixtureServer().start()
+    stdout = sys.stdout
+    try:
+        sys.stdout = open(os.devnull, "w")
+        run = pipeline.run([server.match_url(MATCH_UUID)], scratch_db, venue_id=2)
+        sys.stdout = stdout
+        match_id = run.match_ids[0]
+        conn = sqlite3.connect(scratch_db)
+
+        # --- Import: one detail row per score, values as served ---
+        scores, details = conn.execute("""
+            SELECT COUNT(*), COUNT(sr.score_id) FROM scores sc
+            LEFT JOIN stage_results sr ON sr.score_id = sc.score_id
+            WHERE sc.match_id = ?
+        """, (match_id,)).fetchone()
+        ok = check("every score has detail", scores == details == (LONG_MATCH_STAGES + 1) * SHOOTERS,
+                   f"{details} of {scores}") and ok
+        frame = stage_results.load(conn)
+        frame = frame[frame["match_id"] == match_id]
+        wrong = 0
+        for row in frame.to_dict("records"):
+            want = fixture_row(row["place"] - 1)
+            wrong += {field: row[field] for field in want} != want
+        ok = check("stage values", len(frame) == LONG_MATCH_STAGES * SHOOTERS and wrong == 0,
+                   f"{len(frame)} stage rows, {wrong} wrong") and ok
+        ok = check("compact dtypes", frame["a"].dtype == "Int16" and frame["class"].dtype == "category"
+                   and frame["time"].dtype == "float32", f"{frame.memory_usage(deep=True).sum()} bytes") and ok
+
+        # --- Hit rate: A+C+D hits over hits + misses ---
+        hits = sum(fixture_row(i)["a"] + fixture_row(i)["c"] + fixture_row(i)["d"] for i in range(SHOOTERS))
+        shots = hits + sum(fixture_row(i)["misses"] for i in range(SHOOTERS))
+        rates = stage_results.hit_rate_by_stage(frame)
+        ok = check("hit rate by stage", len(rates) == LONG_MATCH_STAGES
+                   and (rates["hit_rate"] - hits / shots).abs().max() < 1e-9,
+                   f"{hits}/{shots} on each of {len(rates)} stages") and ok
+
+        # --- Parquet round trip ---
+        if stage_results.pyarrow is None:
+            print("⚠️ pyarrow not installed, Parquet export not checked")
+        else:
+            paths = stage_results.export_parquet(conn, out_dir=os.path.join(scratch, "exports"))
+            exported = pd.concat([pd.read_parquet(path) for path in paths], ignore_index=True)
+            # A text column nobody filled in comes back as object rather than an empty category
+            exported = exported.astype({field: "category" for field in stage_results.TEXT_FIELDS})
+            loaded = stage_results.load(conn)
+            ok = check("parquet round trip", exported.equals(loaded) and dict(exported.dtypes) == dict(loaded.dtypes),
+                       f"{len(paths)} file(s), {len(exported)} rows") and ok
+
+        # --- Detail follows its score ---
+        first, second = [row[0] for row in conn.execute("""
+            SELECT shooter_id FROM scores WHERE match_id = ? AND stage_no = 0 ORDER BY place LIMIT 2
+        """, (match_id,))]
+        sys.stdout = open(os.devnull, "w")
+        merge_shooters.merge(conn, {second: first})
+        sys.stdout = stdout
+        orphans = conn.execute("""
+            SELECT COUNT(*) FROM stage_results sr LEFT JOIN scores sc ON sc.score_id = sr.score_id
+            WHERE sc.score_id IS NULL
+        """).fetchone()[0]
+        kept = conn.execute("""
+            SELECT COUNT(*) FROM stage_results sr JOIN scores sc ON sc.score_id = sr.score_id
+            WHERE sc.match_id = ? AND sc.shooter_id = ?
+        """, (match_id, first)).fetchone()[0]
+        ok = check("merge keeps detail with scores", orphans == 0 and kept == LONG_MATCH_STAGES + 1,
+                   f"{kept} rows for the kept shooter, {orphans} orphaned") and ok
+        score_ids = [row[0] for row in conn.execute("SELECT score_id FROM scores WHERE match_id = ?", (match_id,))]
+        with conn:
+            conn.execute("DELETE FROM scores WHERE match_id = ?", (match_id,))
+        left = conn.execute(f"""
+            SELECT COUNT(*) FROM stage_results WHERE score_id IN ({",".join("?" * len(score_ids))})
+        """, score_ids).fetchone()[0]
+        ok = check("deleted scores take their detail", left == 0,
+                   f"{left} of {len(score_ids)} detail rows left") and ok
+        conn.close()
+    finally:
+        sys.stdout = stdout
+        server.stop()
+        shutil.rmtree(scratch)
+
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,70 @@
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import standings
+from checks import db_path_arg, memory_copy
+
+# Usage: python Tools/verify_standings.py [database]
+# Builds the leaderboard the way home.py used to (pandas pivot + merge + sort) and checks
+# the standings table, the on-the-fly fallback and every class filter give the same rows.
+
+
+def legacy_leaderboard(conn):
+    # home.py before the standings table, verbatim apart from the Streamlit calls and the stage_no column
+    df = pd.read_sql_query("""
+        SELECT s.shooter_id, s.name AS shooter_name, s.classification, s.wyco_points
+        FROM shooters s
+        WHERE s.wyco_points IS NOT NULL
+        AND s.wyco_number IS NOT NULL
+        AND s.membership_active = 1
+    """, conn)
+    venue_scores = pd.read_sql_query("""
+        SELECT sc.shooter_id, m.venue_id, MAX(sc.percentage) AS top_score
+        FROM scores sc
+        JOIN matches m ON sc.match_id = m.match_id
+        WHERE sc.stage_no = 0
+        GROUP BY sc.shooter_id, m.venue_id
+    """, conn)
+    venue_wide = venue_scores.pivot(index="shooter_id", columns="venue_id", values="top_score")
+    venue_wide.rename(columns=standings.VENUE_COLUMNS, inplace=True)
+    venue_wide.reset_index(inplace=True)
+    df = df.merge(venue_wide, on="shooter_id", how="left")
+    for col in standings.VENUE_COLUMNS.values():
+        if col not in df.columns:
+            df[col] = None
+    # Ties broken by shooter_id, which the old unstable sort left to chance
+    df = df.sort_values(by=["wyco_points", "shooter_id"], ascending=[False, True]).reset_index(drop=True)
+    df.insert(0, "rank", range(1, len(df) + 1))
+    return df[standings.STANDINGS_COLUMNS]
+
+
+def compare(label, expected, actual):
+    expected = expected.reset_index(drop=True)
+    actual = actual.reset_index(drop=True)
+    try:
+        pd.testing.assert_frame_equal(expected, actual, check_dtype=False)
+        print(f"✅ {label}: {len(expected)} rows match")
+        return True
+    except AssertionError as e:
+        print(f"❌ {label}: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    conn = memory_copy(db_path_arg())
+    expected = legacy_leaderboard(conn)
+
+    ok = compare("on-the-fly (empty table)", expected, standings.load(conn))
+    standings.refresh(conn)
+    ok = compare("standings table", expected, standings.load(conn)) and ok
+    for class_name in ["A", "B", "C", "Unclassified"]:
+        ok = compare(f"filter {class_name}", expected[expected["classification"] == class_name],
+                     standings.load(conn, class_name)) and ok
+
+    plan = conn.execute("EXPLAIN QUERY PLAN SELECT * FROM standings WHERE classification = ? ORDER BY rank", ("A",)).fetchall()
+    print(f"🔍 class filter plan: {'; '.join(row[3] for row in plan)}")
+    conn.close()
+    sys.exit(0 if ok else 1)
@@ -1,41 +1,34 @@
+import os
 import sqlite3
-import pandas as pd
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import import_shooters
 
 # --- Load CSV ---
 csv_path = "wyconumbers.csv"  # Replace with your actual file path
-df = pd.read_csv(csv_path)
-
-# Normalize column headers and whitespace
-df.columns = df.columns.str.strip().str.lower()
-
-# Format shooter name to match database: "Last, First"
-df['formatted_name'] = df['member_last_name'].str.strip() + ", " + df['member_first_name'].str.strip()
+roster = import_shooters.load_roster(csv_path)
 
 # --- Connect to the database ---
 db_path = "allshooters_dev.db"
 conn = sqlite3.connect(db_path)
-cursor = conn.cursor()
-
-updated = 0
-
-# --- Loop and update ---
-for _, row in df.iterrows():
-    name = row['formatted_name']
-    wyco_number = row['user_id']
-
-    cursor.execute("""
-        UPDATE shooters
-        SET wyco_number = ?
-        WHERE name = ?
-    """, (wyco_number, name))
 
-    if cursor.rowcount > 0:
-        updated += 1
-    else:
-        print(f"⚠️ Shooter not found: {name}")
+# --- Numbers only, matched on exact name (the dev DB predates shooter_id and aliases) ---
+with conn:
+    conn.execute("CREATE TEMP TABLE roster (name TEXT, wyco_number TEXT)")
+    conn.executemany("INSERT INTO roster VALUES (?, ?)", roster[["name", "wyco_number"]].itertuples(index=False))
+    updated = conn.execute("""
+        UPDATE shooters SET wyco_number = r.wyco_number
+        FROM roster r
+        WHERE r.name = shooters.name
+    """).rowcount
+    missing = [name for (name,) in conn.execute(
+        "SELECT name FROM roster WHERE name NOT IN (SELECT name FROM shooters) ORDER BY rowid"
+    )]
 
 # --- Finish up ---
-conn.commit()
 conn.close()
 
+for name in missing:
+    print(f"⚠️ Shooter not found: {name}")
 print(f"\n✅ WYCO numbers updated for {updated} shooter(s).")
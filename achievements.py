@@ -1,49 +1,55 @@
 import sqlite3
 import pandas as pd
 
+import migrations
+
 DB_PATH = "allshooters_prs.db"
 
-conn = sqlite3.connect(DB_PATH)
-cursor = conn.cursor()
 
-# Load scores and matches
-scores = pd.read_sql_query("SELECT * FROM scores WHERE stage_name = 'Overall'", conn)
-matches = pd.read_sql_query("SELECT match_id, match_date FROM matches", conn)
+def earned_achievements(scores):
+    # (shooter_id, match_id, achievement) for every Overall score row that earns one
+    earned = []
+
+    # 🥇 Top Gun
+    top_guns = scores[scores["place"] == 1]
+    earned += [(sid, mid, "🥇 Top Gun") for sid, mid in zip(top_guns["shooter_id"], top_guns["match_id"])]
+
+    # 😬 Well, you tried...
+    tried = scores[(scores["percentage"] > 0) & (scores["percentage"] < 20)]
+    earned += [(sid, mid, "😬 Well, you tried...") for sid, mid in zip(tried["shooter_id"], tried["match_id"])]
 
-# Merge match date
-scores = scores.merge(matches, on="match_id", how="left")
-scores["match_month"] = pd.to_datetime(scores["match_date"]).dt.to_period("M")
+    # 🎯 Threesome: every match of a month in which the shooter shot 3 or more
+    per_month = scores.groupby(["shooter_id", "match_month"])["match_id"].transform("size")
+    threesomes = scores[per_month >= 3]
+    earned += [(sid, mid, "🎯 Threesome") for sid, mid in zip(threesomes["shooter_id"], threesomes["match_id"])]
+    return [(int(sid), int(mid), achievement) for sid, mid, achievement in earned]
 
-earned = []
 
-# 🥇 Top Gun
-top_guns = scores[scores["place"] == 1]
-for _, row in top_guns.iterrows():
-    earned.append((row["shooter_id"], row["match_id"], "🥇 Top Gun"))
+def award(conn):
+    # Recomputed from every Overall score (a new match can complete an older month's Threesome);
+    # INSERT OR IGNORE keeps what's already stored. Returns (earned, newly stored)
+    scores = pd.read_sql_query("SELECT * FROM scores WHERE stage_no = 0", conn)
+    matches = pd.read_sql_query("SELECT match_id, match_date FROM matches", conn)
+    scores = scores.merge(matches, on="match_id", how="left")
+    scores["match_month"] = pd.to_datetime(scores["match_date"]).dt.to_period("M")
 
-# 😬 Well, you tried...
-tried = scores[(scores["percentage"] > 0) & (scores["percentage"] < 20)]
-for _, row in tried.iterrows():
-    earned.append((row["shooter_id"], row["match_id"], "😬 Well, you tried..."))
+    earned = earned_achievements(scores)
+    before = conn.total_changes
+    with conn:
+        conn.executemany("""
+            INSERT OR IGNORE INTO achievements (shooter_id, match_id, achievement)
+            VALUES (?, ?, ?)
+        """, earned)
+    return len(earned), conn.total_changes - before
 
-# 🎯 Threesome
-grouped = scores.groupby(["shooter_id", "match_month"]).size().reset_index(name="count")
-threesomes = grouped[grouped["count"] >= 3]
 
-for _, row in threesomes.iterrows():
-    sid = row["shooter_id"]
-    month = row["match_month"]
-    matched = scores[(scores["shooter_id"] == sid) & (scores["match_month"] == month)]
-    for _, r in matched.iterrows():
-        earned.append((r["shooter_id"], r["match_id"], "🎯 Threesome"))
+if __name__ == "__main__":
+    conn = sqlite3.connect(DB_PATH)
 
-# Insert into achievements table
-cursor.executemany("""
-    INSERT OR IGNORE INTO achievements (shooter_id, match_id, achievement)
-    VALUES (?, ?, ?)
-""", earned)
+    # Bring the schema up to date (stage numbers, achievements table)
+    migrations.migrate(conn)
 
-conn.commit()
-conn.close()
+    earned, stored = award(conn)
+    conn.close()
 
-print(f"✅ {len(earned)} achievements awarded and stored.")
+    print(f"✅ {earned} achievements awarded and stored.")
@@ -0,0 +1,137 @@
+import asyncio
+import random
+import threading
+from collections import defaultdict, namedtuple
+from urllib.parse import urlparse
+
+import httpx
+
+import page_cache
+import practiscore_html
+
+# Many pages in flight at once without hammering any one site: per-host concurrency cap plus a
+# token bucket, and timeouts/5xx retried with exponential backoff before a page counts as failed.
+HOST_CONCURRENCY = 4
+RATE_PER_SECOND = 8.0   # sustained requests per host
+BURST = 8               # requests a host may get back to back before the rate applies
+RETRIES = 3             # extra attempts after the first
+BACKOFF = 0.5           # seconds before the first retry, doubled for each one after
+RETRY_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+# status: "ok" (html is the page), "missing" (404: no such page, e.g. past the last stage),
+# "failed" (still erroring after every retry; error says why)
+FetchResult = namedtuple("FetchResult", "url status html error attempts")
+
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = burst
+        self.updated = None
+        self.lock = asyncio.Lock()
+
+    async def take(self):
+        async with self.lock:
+            loop = asyncio.get_running_loop()
+            while True:
+                now = loop.time()
+                if self.updated is not None:
+                    self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class AsyncFetcher:
+    # --- Runs its own event loop on a background thread, so plain (threaded) code calls fetch_many ---
+    def __init__(self, concurrency=HOST_CONCURRENCY, rate=RATE_PER_SECOND, burst=BURST, retries=RETRIES,
+                 backoff=BACKOFF, timeout=practiscore_html.HTTP_TIMEOUT, cache=None):
+        self.concurrency = concurrency
+        self.rate = rate
+        self.burst = burst
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.cache = cache
+        self.loop = None
+        self.thread = None
+        self.client = None
+        self.semaphores = {}
+        self.buckets = {}
+        self.requests = defaultdict(int)  # per host, retries included
+
+    def start(self):
+        if self.loop is None:
+            self.loop = asyncio.new_event_loop()
+            self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+            self.thread.start()
+
+    def host_limits(self, url):
+        # Only ever touched on the loop thread
+        host = urlparse(url).netloc
+        if host not in self.semaphores:
+            self.semaphores[host] = asyncio.Semaphore(self.concurrency)
+            self.buckets[host] = TokenBucket(self.rate, self.burst)
+        return host, self.semaphores[host], self.buckets[host]
+
+    async def get_once(self, url):
+        # One attempt: (status, html, error, retryable). The page cache is SQLite + gzip files, so it's read
+        # and written on a worker thread to keep the loop free for the other downloads
+        cached = await asyncio.to_thread(self.cache.get, url) if self.cache else None
+        host, semaphore, bucket = self.host_limits(url)
+        async with semaphore:
+            await bucket.take()
+            self.requests[host] += 1
+            try:
+                response = await self.client.get(url, headers=page_cache.conditional_headers(cached))
+            except httpx.TimeoutException as e:
+                return "failed", None, f"timed out ({type(e).__name__})", True
+            except httpx.HTTPError as e:
+                return "failed", None, f"{type(e).__name__}: {e}", True
+        if response.status_code == 304 and cached:
+            return "ok", cached.html, None, False
+        if response.status_code == 404:
+            return "missing", None, None, False
+        if response.status_code >= 400:
+            return "failed", None, f"HTTP {response.status_code}", response.status_code in RETRY_STATUS
+        if self.cache:
+            await asyncio.to_thread(self.cache.put, url, response.text, response.headers.get("ETag"),
+                                    response.headers.get("Last-Modified"))
+        return "ok", response.text, None, False
+
+    async def fetch(self, url):
+        for attempt in range(1, self.retries + 2):
+            status, html, error, retryable = await self.get_once(url)
+            if not retryable or attempt > self.retries:
+                return FetchResult(url, status, html, error, attempt)
+            # Jittered so pages that failed together don't all retry in the same instant
+            await asyncio.sleep(self.backoff * 2 ** (attempt - 1) * random.uniform(1.0, 1.25))
+
+    async def fetch_all(self, urls):
+        if self.client is None:
+            self.client = httpx.AsyncClient(
+                timeout=self.timeout,
+                follow_redirects=True,
+                headers={"User-Agent": practiscore_html.USER_AGENT},
+                limits=httpx.Limits(max_connections=None, max_keepalive_connections=self.concurrency * 2),
+            )
+        return await asyncio.gather(*(self.fetch(url) for url in urls))
+
+    def fetch_many(self, urls):
+        # Every URL at once (the host limits do the pacing); results in the same order as urls
+        self.start()
+        return asyncio.run_coroutine_threadsafe(self.fetch_all(list(urls)), self.loop).result()
+
+    def close(self):
+        if self.loop is None:
+            return
+        if self.client is not None:
+            asyncio.run_coroutine_threadsafe(self.client.aclose(), self.loop).result()
+        asyncio.run_coroutine_threadsafe(self.loop.shutdown_default_executor(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+        self.loop = None
@@ -1,122 +1,254 @@
+import argparse
+import json
 import sqlite3
 
+import numpy as np
+import pandas as pd
+
+import migrations
+import standings
+
 # Connect to the database
 db_path = r"C:\Practiscore\allshooters_prs.db"
-conn = sqlite3.connect(db_path)
-cursor = conn.cursor()
-
-# Ensure wyco_points column exists in scores table
-try:
-    cursor.execute("ALTER TABLE scores ADD COLUMN wyco_points REAL")
-except sqlite3.OperationalError:
-    pass  # Already exists
 
 # Classification thresholds
 A_THRESHOLD = 87.0
 B_THRESHOLD = 67.0
 class_rank = {"Unclassified": 0, "C": 1, "B": 2, "A": 3}
+# Initial class -> (class after 3 straight matches over the threshold, threshold)
+PROMOTIONS = {"C": ("B", B_THRESHOLD), "B": ("A", A_THRESHOLD)}
 
+STATE_COLUMNS = ["scores_counted", "initial_class", "computed_class", "class_match_id", "class_reason",
+                 "recent_scores", "last_match_date", "last_match_id"]
 
-def calculate_wyco_points():
-    print("\n🎯 Calculating WYCO points...")
 
-    match_ids = cursor.execute("SELECT match_id FROM matches").fetchall()
-    for (match_id,) in match_ids:
-        cursor.execute("""
-            SELECT MAX(points) FROM scores
-            WHERE match_id = ? AND stage_name = 'Overall'
-        """, (match_id,))
-        max_points = cursor.fetchone()[0]
+def id_filter(column, ids):
+    if ids is None:
+        return "", []
+    ids = [int(i) for i in ids]
+    return f"AND {column} IN ({','.join('?' * len(ids))})", ids
 
-        if not max_points or max_points == 0:
-            continue
 
-        cursor.execute("""
-            SELECT score_id, points FROM scores
-            WHERE match_id = ? AND stage_name = 'Overall'
-        """, (match_id,))
-        for score_id, points in cursor.fetchall():
-            wyco = round((points / max_points) * 100, 3) if points else 0
-            cursor.execute("UPDATE scores SET wyco_points = ? WHERE score_id = ?", (wyco, score_id))
-
-    conn.commit()
-    print("✅ WYCO points updated.\n")
-
-
-def determine_initial_class(scores):
-    first_three = scores[:3]
-    if len(first_three) < 3:
-        return "Unclassified"
-    avg = sum(first_three) / 3
-    if avg <= B_THRESHOLD:
-        return "C"
-    elif avg <= A_THRESHOLD:
-        return "B"
-    else:
-        return "A"
-
-
-def evaluate_class_promotion(existing_class, all_percentages):
-    for i in range(len(all_percentages) - 2):
-        window = all_percentages[i:i+3]
-        if existing_class == "C" and all(p > B_THRESHOLD for p in window):
-            return "B"
-        elif existing_class == "B" and all(p > A_THRESHOLD for p in window):
-            return "A"
-    return existing_class
-
-
-def classify_shooters():
-    print("\n🔍 Re-classifying shooters based on non-zero WYCO scores...")
+def initial_reason(avg):
+    return f"first 3 matches averaged {avg:.2f}"
+
 
-    shooter_ids = cursor.execute("""
+def promotion_reason(threshold):
+    return f"3 straight matches over {threshold:g}"
+
+
+def load_members(conn, shooter_ids=None):
+    shooter_filter, params = id_filter("shooter_id", shooter_ids)
+    return pd.read_sql_query(f"""
         SELECT shooter_id, name,
-            CASE 
+            CASE
                 WHEN classification IS NULL OR TRIM(classification) = '' THEN 'Unclassified'
-                ELSE classification 
+                ELSE classification
             END AS classification
         FROM shooters
-        WHERE wyco_number IS NOT NULL AND membership_active = 1
-    """).fetchall()
-
-    updated_count = 0
-
-    for shooter_id, name, current_class in shooter_ids:
-        percentages = cursor.execute("""
-            SELECT sc.wyco_points
-            FROM scores sc
-            JOIN matches m ON sc.match_id = m.match_id
-            WHERE sc.shooter_id = ? AND sc.stage_name = 'Overall' AND sc.wyco_points > 0
-            ORDER BY m.match_date ASC
-        """, (shooter_id,)).fetchall()
-
-        percentages = [p[0] for p in percentages if p[0] is not None]
-
-        if len(percentages) < 3:
-            if current_class != "Unclassified":
-                cursor.execute(
-                    "UPDATE shooters SET classification = 'Unclassified' WHERE shooter_id = ?",
-                    (shooter_id,)
-                )
-                print(f"🔸 {name}: {current_class} → Unclassified (not enough scores)")
+        WHERE wyco_number IS NOT NULL AND membership_active = 1 {shooter_filter}
+    """, conn, params=params)
+
+
+def history_query(shooter_ids=None, match_ids=None):
+    # Non-zero Overall WYCO scores of active members, in one query. (sql, params) for Tools/check_query_plans.py
+    shooter_filter, shooter_params = id_filter("sc.shooter_id", shooter_ids)
+    match_filter, match_params = id_filter("sc.match_id", match_ids)
+    return f"""
+        SELECT sc.shooter_id, sc.match_id, m.match_date, sc.wyco_points
+        FROM scores sc
+        JOIN matches m ON sc.match_id = m.match_id
+        JOIN shooters s ON sc.shooter_id = s.shooter_id
+        WHERE sc.stage_no = 0 AND sc.wyco_points > 0
+        AND s.wyco_number IS NOT NULL AND s.membership_active = 1
+        {shooter_filter} {match_filter}
+    """, shooter_params + match_params
+
+
+def load_history(conn, shooter_ids=None, match_ids=None):
+    sql, params = history_query(shooter_ids, match_ids)
+    history = pd.read_sql_query(sql, conn, params=params)
+    # Same order the per-shooter query saw: by date, ties in index order
+    return history.sort_values(["shooter_id", "match_date", "match_id", "wyco_points"], kind="stable")
+
+
+# --- Full evaluation: every shooter's whole history at once ---
+def compute_classes(history):
+    by_shooter = history.groupby("shooter_id", sort=False)["wyco_points"]
+    seq = by_shooter.cumcount()
+
+    # Average of the first three, added left to right like sum(first_three) / 3
+    first_three = (
+        history.assign(seq=seq)[seq < 3]
+        .pivot(index="shooter_id", columns="seq", values="wyco_points")
+        .reindex(columns=range(3))
+    )
+    avg = (first_three[0] + first_three[1] + first_three[2]) / 3
+    initial = pd.Series(np.select([avg <= B_THRESHOLD, avg <= A_THRESHOLD], ["C", "B"], "A"), index=avg.index)
+
+    # Worst score of each rolling 3-match window: every score in it beats a threshold iff the minimum does
+    window_min = pd.concat([history["wyco_points"], by_shooter.shift(1), by_shooter.shift(2)], axis=1).min(axis=1, skipna=False)
+    row_initial = history["shooter_id"].map(initial)
+    qualifies = ((row_initial == "C") & (window_min > B_THRESHOLD)) | ((row_initial == "B") & (window_min > A_THRESHOLD))
+
+    # A promotion only ever moves one class up from the initial class, at the first window that qualifies
+    promoted_at = history[qualifies].groupby("shooter_id", sort=False)["match_id"].first()
+    last = history.groupby("shooter_id", sort=False)[["match_date", "match_id"]].last()
+
+    result = pd.DataFrame({"scores_counted": by_shooter.size()})
+    result["initial_class"] = initial
+    result["computed_class"] = initial
+    result["class_match_id"] = history[seq == 2].set_index("shooter_id")["match_id"]
+    result["class_reason"] = avg.map(lambda a: initial_reason(a) if pd.notna(a) else None)
+    for old_class, (new_class, threshold) in PROMOTIONS.items():
+        promoted = result.index.isin(promoted_at.index) & (result["initial_class"] == old_class)
+        result.loc[promoted, "computed_class"] = new_class
+        result.loc[promoted, "class_match_id"] = promoted_at[result.index[promoted]]
+        result.loc[promoted, "class_reason"] = promotion_reason(threshold)
+    result.loc[result["scores_counted"] < 3, ["initial_class", "computed_class"]] = "Unclassified"
+
+    result["recent_scores"] = by_shooter.apply(lambda points: json.dumps(points.tail(3).tolist()))
+    result["last_match_date"] = last["match_date"]
+    result["last_match_id"] = last["match_id"]
+    return result[STATE_COLUMNS]
+
+
+# --- Incremental evaluation: continue a stored state with scores from newer matches ---
+def advance_state(state, new_scores):
+    state = dict(state)
+    recent = json.loads(state["recent_scores"])
+    for match_id, match_date, points in new_scores:
+        state["scores_counted"] += 1
+        recent = (recent + [points])[-3:]
+        if state["scores_counted"] == 3:
+            avg = (recent[0] + recent[1] + recent[2]) / 3
+            initial = "C" if avg <= B_THRESHOLD else "B" if avg <= A_THRESHOLD else "A"
+            state.update(initial_class=initial, computed_class=initial,
+                         class_match_id=match_id, class_reason=initial_reason(avg))
+        not_yet_promoted = state["computed_class"] == state["initial_class"]
+        if state["scores_counted"] >= 3 and not_yet_promoted and state["initial_class"] in PROMOTIONS:
+            new_class, threshold = PROMOTIONS[state["initial_class"]]
+            if all(p > threshold for p in recent):
+                state.update(computed_class=new_class, class_match_id=match_id,
+                             class_reason=promotion_reason(threshold))
+        state.update(last_match_date=match_date, last_match_id=match_id)
+    state["recent_scores"] = json.dumps(recent)
+    return state
+
+
+def load_states(conn, shooter_ids):
+    shooter_filter, params = id_filter("shooter_id", shooter_ids)
+    return pd.read_sql_query(f"""
+        SELECT shooter_id, {', '.join(STATE_COLUMNS)} FROM classification_state
+        WHERE 1 = 1 {shooter_filter}
+    """, conn, params=params).set_index("shooter_id")
+
+
+def plan_changes(members, states):
+    members = members.set_index("shooter_id").join(states)
+    members["scores_counted"] = members["scores_counted"].fillna(0)
+    # No stored states at all (e.g. a new member with no scores) leaves the text column as all-NaN floats
+    members["class_reason"] = members["class_reason"].astype(object)
+    current_rank = members["classification"].map(class_rank)
+    computed_rank = members["computed_class"].map(class_rank)
+
+    demote = (members["scores_counted"] < 3) & (members["classification"] != "Unclassified")
+    promote = (members["scores_counted"] >= 3) & (computed_rank > current_rank)
+
+    members["new_class"] = None
+    members.loc[demote, "new_class"] = "Unclassified"
+    members.loc[demote, "class_match_id"] = None
+    members.loc[demote, "class_reason"] = "fewer than 3 non-zero scores"
+    members.loc[promote, "new_class"] = members.loc[promote, "computed_class"]
+    changes = members[members["new_class"].notna()].reset_index()
+    return changes[["shooter_id", "name", "classification", "new_class", "class_match_id", "class_reason"]]
+
+
+def apply_classes(conn, members, states):
+    changes = plan_changes(members, states)
+    history_rows = [
+        (int(row.shooter_id), row.classification, row.new_class,
+         None if pd.isna(row.class_match_id) else int(row.class_match_id), row.class_reason)
+        for row in changes.itertuples()
+    ]
+    state_rows = [
+        (int(row.Index), int(row.scores_counted), row.initial_class, row.computed_class,
+         None if pd.isna(row.class_match_id) else int(row.class_match_id), row.class_reason,
+         row.recent_scores, row.last_match_date, int(row.last_match_id))
+        for row in states.itertuples()
+    ]
+    with conn:
+        conn.executemany(
+            "UPDATE shooters SET classification = ? WHERE shooter_id = ?",
+            list(zip(changes["new_class"], changes["shooter_id"].tolist()))
+        )
+        conn.executemany("""
+            INSERT INTO classification_history (shooter_id, previous_class, classification, match_id, reason)
+            VALUES (?, ?, ?, ?, ?)
+        """, history_rows)
+        conn.executemany(f"""
+            INSERT OR REPLACE INTO classification_state (shooter_id, {', '.join(STATE_COLUMNS)})
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, state_rows)
+    return changes
+
+
+def classify_shooters(conn):
+    return apply_classes(conn, load_members(conn), compute_classes(load_history(conn)))
+
+
+def reclassify(conn, shooter_ids):
+    # Whole-history rebuild for just these shooters (e.g. after merging profiles, when stored windows are stale)
+    return apply_classes(conn, load_members(conn, shooter_ids), compute_classes(load_history(conn, shooter_ids=shooter_ids)))
+
+
+def classify_matches(conn, match_ids):
+    # Only members who shot these matches are looked at, and only their new scores are evaluated
+    new_scores = load_history(conn, match_ids=match_ids)
+    shooter_ids = new_scores["shooter_id"].unique().tolist()
+    stored = load_states(conn, shooter_ids)
+
+    advanced, rebuild = {}, []
+    for shooter_id, rows in new_scores.groupby("shooter_id", sort=False):
+        first_new = (rows["match_date"].iloc[0] or "", rows["match_id"].iloc[0])
+        if shooter_id not in stored.index:
+            rebuild.append(shooter_id)
+            continue
+        state = stored.loc[shooter_id]
+        # A match dated before what we've already counted (or a repeat) means the stored window is stale
+        if first_new <= (state["last_match_date"] or "", state["last_match_id"]):
+            rebuild.append(shooter_id)
             continue
+        advanced[shooter_id] = advance_state(state, zip(rows["match_id"], rows["match_date"], rows["wyco_points"]))
 
-        initial_class = determine_initial_class(percentages)
-        final_class = evaluate_class_promotion(initial_class, percentages)
+    states = pd.DataFrame.from_dict(advanced, orient="index", columns=STATE_COLUMNS)
+    if rebuild:
+        states = pd.concat([states, compute_classes(load_history(conn, shooter_ids=rebuild))])
+    return apply_classes(conn, load_members(conn, shooter_ids), states)
 
-        if class_rank[final_class] > class_rank[current_class]:
-            cursor.execute(
-                "UPDATE shooters SET classification = ? WHERE shooter_id = ?",
-                (final_class, shooter_id)
-            )
-            updated_count += 1
-            print(f"🔹 {name}: {current_class} → {final_class}")
 
-    conn.commit()
-    print(f"\n✅ Classification updated for {updated_count} shooter(s).")
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Classify WYCO members")
+    parser.add_argument("--match-ids", type=int, nargs="+",
+                        help="only evaluate the new scores from these matches against each shooter's stored window")
+    parser.add_argument("--db", default=db_path, help="database to update (default: %(default)s)")
+    args = parser.parse_args()
 
+    conn = sqlite3.connect(args.db)
 
-# Run everything
-calculate_wyco_points()
-classify_shooters()
-conn.close()
+    # --- Bring the schema up to date (wyco_points columns, indexes) ---
+    migrations.migrate(conn)
+
+    print("\n🔍 Re-classifying shooters based on non-zero WYCO scores...")
+    changes = classify_matches(conn, args.match_ids) if args.match_ids else classify_shooters(conn)
+    standings.refresh(conn)
+    conn.close()
+
+    for row in changes.itertuples():
+        if row.new_class == "Unclassified":
+            print(f"🔸 {row.name}: {row.classification} → Unclassified (not enough scores)")
+        else:
+            print(f"🔹 {row.name}: {row.classification} → {row.new_class} ({row.class_reason})")
+
+    promoted = (changes["new_class"] != "Unclassified").sum()
+    print(f"\n✅ Classification updated for {promoted} shooter(s).")
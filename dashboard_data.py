@@ -0,0 +1,116 @@
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+import pandas as pd
+import streamlit as st
+
+import match_detail
+import shooter_stats
+import standings
+
+# Shared by home.py and everything in pages/. Every viewer session reads through one pool of
+# read-only connections, and query results are cached until the database actually changes.
+DB_PATH = "allshooters_prs.db"
+POOL_SIZE = 4
+CACHE_TTL = 15 * 60  # seconds; the data version below catches imports sooner
+
+
+class ReadPool:
+    def __init__(self, db_path, size):
+        self.db_path = db_path
+        self.idle = queue.LifoQueue()
+        for _ in range(size):
+            self.idle.put(self.connect())
+        # PRAGMA data_version is only comparable on the same connection, so one is kept just for that
+        self.version_conn = self.connect()
+        self.version_lock = threading.Lock()
+
+    def connect(self):
+        return sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True, check_same_thread=False)
+
+    @contextmanager
+    def connection(self):
+        conn = self.idle.get()
+        try:
+            yield conn
+        finally:
+            self.idle.put(conn)
+
+    def data_version(self):
+        # data_version moves when another connection commits; the file time catches the DB being swapped out
+        with self.version_lock:
+            version = self.version_conn.execute("PRAGMA data_version").fetchone()[0]
+        return version, os.stat(self.db_path).st_mtime_ns
+
+
+@st.cache_resource
+def read_pool():
+    return ReadPool(DB_PATH, POOL_SIZE)
+
+
+# --- Cached reads: each function below takes a connection first, callers leave it out ---
+READS = {}
+
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def cached_read(version, name, args):
+    with read_pool().connection() as conn:
+        return READS[name](conn, *args)
+
+
+def cached(fn):
+    READS[fn.__name__] = fn
+
+    def read(*args):
+        return cached_read(read_pool().data_version(), fn.__name__, args)
+    read.__name__ = fn.__name__
+    return read
+
+
+@cached
+def leaderboard(conn, classification=None):
+    return standings.load(conn, classification)
+
+
+@cached
+def shooter_list(conn):
+    return pd.read_sql_query("SELECT shooter_id, name FROM shooters ORDER BY name", conn)
+
+
+@cached
+def match_list(conn):
+    return pd.read_sql_query("SELECT match_id, match_name FROM matches ORDER BY match_date DESC", conn)
+
+
+@cached
+def shooter_meta(conn, shooter_id):
+    return pd.read_sql_query("""
+        SELECT classification, wyco_points
+        FROM shooters
+        WHERE shooter_id = ?
+    """, conn, params=(int(shooter_id),))
+
+
+@cached
+def shooter_years(conn, shooter_id):
+    return shooter_stats.years(conn, shooter_id)
+
+
+@cached
+def shooter_summary(conn, shooter_id, year=shooter_stats.ALL_YEARS):
+    return shooter_stats.load(conn, shooter_id, year)
+
+
+@cached
+def shooter_results(conn, shooter_id, year=shooter_stats.ALL_YEARS):
+    # Non-zero Overall results, oldest first
+    return shooter_stats.load_results(conn, [shooter_id], year)
+
+
+@cached
+def match(conn, match_id):
+    # Overall and every stage in one query, cached per match
+    return match_detail.load(conn, match_id)
@@ -1,25 +1,74 @@
 import sqlite3
 from collections import defaultdict
 
+import identity
+import merge_shooters
+import migrations
+
 # --- Connect to the database ---
 db_path = "allshooters_prs.db"
 conn = sqlite3.connect(db_path)
 cursor = conn.cursor()
 
-# --- Helper: Normalize shooter name ---
-def normalize_name(name: str) -> str:
-    parts = [part.strip().capitalize() for part in name.split(",")]
-    if len(parts) == 2:
-        return f"{parts[0]}, {parts[1]}"
-    return name.strip().title()
+# --- Exact duplicate names first: migration 4 won't index shooters.name until they're gone ---
+# Only older databases can have them. They're folded the way this script always did it (scores and
+# achievements to the oldest profile, gaps filled from the others), since merge_shooters needs the newer schema
+NAME_INDEX = migrations.MIGRATIONS.index(migrations.hot_lookup_indexes)
+migrations.migrate(conn, target=NAME_INDEX)
+premerge_log = []
+premerge_primaries = set()
+if migrations.schema_version(conn) == NAME_INDEX:
+    with conn:
+        for name, ids in conn.execute("""
+            SELECT name, GROUP_CONCAT(shooter_id) FROM (SELECT name, shooter_id FROM shooters ORDER BY shooter_id)
+            WHERE name IS NOT NULL GROUP BY name HAVING COUNT(*) > 1
+        """).fetchall():
+            primary_id, *duplicate_ids = [int(i) for i in ids.split(",")]
+            for dup_id in duplicate_ids:
+                conn.execute("UPDATE scores SET shooter_id = ? WHERE shooter_id = ?", (primary_id, dup_id))
+                conn.execute("UPDATE OR IGNORE achievements SET shooter_id = ? WHERE shooter_id = ?", (primary_id, dup_id))
+                conn.execute("DELETE FROM achievements WHERE shooter_id = ?", (dup_id,))
+                conn.execute("""
+                    UPDATE shooters SET
+                        wyco_number = COALESCE(NULLIF(shooters.wyco_number, ''), d.wyco_number),
+                        classification = COALESCE(NULLIF(shooters.classification, ''), d.classification),
+                        membership_active = COALESCE(shooters.membership_active, d.membership_active)
+                    FROM (SELECT * FROM shooters WHERE shooter_id = ?) d
+                    WHERE shooters.shooter_id = ?
+                """, (dup_id, primary_id))
+                conn.execute("DELETE FROM shooters WHERE shooter_id = ?", (dup_id,))
+                premerge_log.append(f'Merged: "{name}" (ID {dup_id}) → "{name}" (ID {primary_id})')
+            premerge_primaries.add(primary_id)
+
+# --- Then the rest of the schema (shooter_aliases and the derived tables) ---
+migrations.migrate(conn)
 
-# --- Step 1: Fetch all shooters and normalize names ---
-cursor.execute("SELECT shooter_id, name, wyco_number, classification, membership_active FROM shooters")
+# --- Step 1: Fetch all shooters and group the same name spelled differently ---
+cursor.execute("SELECT shooter_id, name, wyco_number, classification, membership_active FROM shooters ORDER BY shooter_id")
 shooters = cursor.fetchall()
 
+# Same name apart from capitalization/spacing, plus profiles named after another shooter's recorded alias.
+# Nickname or look-alike pairs of existing profiles ("Chris" / "Christopher") are often relatives, so those
+# are only listed for a human to decide
+resolver = identity.IdentityResolver(conn)
+group_of = {shooter_id: identity.normalize_name(name) for shooter_id, name, _, _, _ in shooters}
+
+def join_groups(id_a, id_b):
+    old_group = group_of[id_b]
+    for shooter_id, group in group_of.items():
+        if group == old_group:
+            group_of[shooter_id] = group_of[id_a]
+
+for alias, shooter_id in resolver.aliases.items():
+    named = resolver.names.get(alias)
+    if named is not None and named != shooter_id and shooter_id in group_of:
+        join_groups(shooter_id, named)
+
+review_pairs = [pair for pair in resolver.duplicate_pairs() if group_of[pair[1]] != group_of[pair[3]]]
+
 normalized_map = defaultdict(list)
 for shooter_id, name, wyco, cl, active in shooters:
-    norm = normalize_name(name)
+    norm = group_of[shooter_id]
     normalized_map[norm].append({
         "id": shooter_id,
         "name": name,
@@ -28,55 +77,31 @@ for shooter_id, name, wyco, cl, active in shooters:
         "membership_active": active
     })
 
-# --- Step 2: Merge duplicates and preserve data ---
+# --- Step 2: Merge each group into its oldest profile, in one transaction ---
 merge_log = []
-merged_count = 0
+mapping = {}
 
 for norm_name, entries in normalized_map.items():
     if len(entries) < 2:
         continue
 
     primary = entries[0]
-    primary_id = primary["id"]
-    updated_fields = {
-        "wyco_number": primary["wyco_number"],
-        "classification": primary["classification"],
-        "membership_active": primary["membership_active"]
-    }
-
     for duplicate in entries[1:]:
-        dup_id = duplicate["id"]
-        merge_log.append(f'Merged: "{duplicate["name"]}" (ID {dup_id}) → "{primary["name"]}" (ID {primary_id})')
-
-        # Transfer scores
-        cursor.execute("UPDATE scores SET shooter_id = ? WHERE shooter_id = ?", (primary_id, dup_id))
-
-        # Preserve data if primary is missing something
-        if not updated_fields["wyco_number"] and duplicate["wyco_number"]:
-            updated_fields["wyco_number"] = duplicate["wyco_number"]
-        if not updated_fields["classification"] and duplicate["classification"]:
-            updated_fields["classification"] = duplicate["classification"]
-        if updated_fields["membership_active"] is None and duplicate["membership_active"] is not None:
-            updated_fields["membership_active"] = duplicate["membership_active"]
-
-        # Delete the duplicate
-        cursor.execute("DELETE FROM shooters WHERE shooter_id = ?", (dup_id,))
-        merged_count += 1
-
-    # Update the primary shooter with any improved data
-    cursor.execute("""
-        UPDATE shooters
-        SET wyco_number = ?, classification = ?, membership_active = ?
-        WHERE shooter_id = ?
-    """, (
-        updated_fields["wyco_number"],
-        updated_fields["classification"],
-        updated_fields["membership_active"],
-        primary_id
-    ))
+        mapping[duplicate["id"]] = primary["id"]
+        merge_log.append(f'Merged: "{duplicate["name"]}" (ID {duplicate["id"]}) → "{primary["name"]}" (ID {primary["id"]})')
+
+summary = merge_shooters.merge(conn, mapping)
+merged_count = len(premerge_log) + summary.shooters
+merge_log = premerge_log + merge_log
+if premerge_primaries:
+    # Profiles folded before the migration never went through merge_shooters, so they're refreshed here
+    merge_shooters.refresh(conn, premerge_primaries)
+
+# --- Achievements left behind by merges made before they were carried over ---
+with conn:
+    orphans = conn.execute("DELETE FROM achievements WHERE shooter_id NOT IN (SELECT shooter_id FROM shooters)").rowcount
 
 # --- Finalize ---
-conn.commit()
 conn.close()
 
 # --- Print merge log ---
@@ -84,3 +109,14 @@ print(f"\n✅ Merged {merged_count} duplicate shooter profiles.\n")
 print("📋 Merge Log:")
 for log in merge_log:
     print(" -", log)
+if summary.score_conflicts or summary.achievement_conflicts:
+    print(f"🧹 Dropped {summary.score_conflicts} scores and {summary.achievement_conflicts} achievements "
+          f"the primary already had")
+if orphans:
+    print(f"🧹 Removed {orphans} achievements of shooters that no longer exist")
+
+# --- Close calls left for a human: might be the same person, might not ---
+if review_pairs:
+    print("\n🔎 Possible duplicates to check by hand:")
+    for score, id_a, name_a, id_b, name_b in review_pairs:
+        print(f' - "{name_a}" (ID {id_a}) / "{name_b}" (ID {id_b}) — {score:.2f}')
@@ -1,41 +1,132 @@
+import queue
+import threading
 import tkinter as tk
-from tkinter import messagebox
-import subprocess
+from collections import namedtuple
+from tkinter import messagebox, ttk
 
-def run_scripts():
-    url = url_entry.get()
-    venue = venue_entry.get()
+import page_cache
+import pipeline
+import scraperv2
+from progress import Progress, ProgressEvent
 
-    if not url or not venue:
+POLL_MS = 100
+
+# URLs imported in one pipeline run, all at the same venue. Each job carries its own Progress so
+# it can be cancelled whether it's running or still waiting
+ImportJob = namedtuple("ImportJob", "urls venue progress")
+
+jobs = queue.Queue()     # GUI → worker
+events = queue.Queue()   # worker → GUI, ProgressEvent
+open_jobs = []           # queued or running, oldest first (GUI thread only)
+
+# --- Worker: runs queued imports one at a time so the window never freezes ---
+def worker():
+    while True:
+        job = jobs.get()
+        if job.progress.cancelled():
+            events.put(ProgressEvent("skipped", f"Skipped {len(job.urls)} queued match(es)", {"job": job}))
+            continue
+        events.put(ProgressEvent("job", f"Importing {len(job.urls)} match(es) at venue {job.venue}", {"job": job}))
+        try:
+            result = pipeline.run(job.urls, venue_id=job.venue, cache=page_cache.PageCache(), progress=job.progress)
+            events.put(ProgressEvent("done", "", {"job": job, "result": result}))
+        except Exception as e:
+            events.put(ProgressEvent("error", f"Import failed: {e}", {"job": job}))
+
+def queue_import():
+    urls = [line.strip() for line in url_text.get("1.0", tk.END).splitlines() if line.strip()]
+    venue = venue_entry.get().strip()
+
+    if not urls or not venue.isdigit() or int(venue) not in scraperv2.VENUE_MAP.values():
         messagebox.showerror("Input Error", "Please enter both Match URL and Venue ID. 1. Cheyenne 2. Laramie 3. Pawnee 4. Larkspur 5. Rawlins ")
         return
 
-    try:
-        # Run script 1 with arguments
-        subprocess.run(["python", "scraperv2.py", url, venue], check=True)
+    job = ImportJob(urls, int(venue), Progress(events))
+    open_jobs.append(job)
+    jobs.put(job)
+    queue_list.insert(tk.END, f"Venue {venue}: {len(urls)} match(es) — {urls[0]}")
+    url_text.delete("1.0", tk.END)
+
+def cancel_import():
+    # Stops the running import at its next stage and everything still queued before it starts
+    for job in open_jobs:
+        job.progress.cancel()
+    if open_jobs:
+        log("🛑 Cancelling after the current stage...")
 
-        # Run script 2 (no args, or add if needed)
-        subprocess.run(["python", "pointsv2.py"], check=True)
+def log(message):
+    log_text.configure(state=tk.NORMAL)
+    log_text.insert(tk.END, message + "\n")
+    log_text.see(tk.END)
+    log_text.configure(state=tk.DISABLED)
 
-        # Run script 3
-        subprocess.run(["python", "classify_shooters.py"], check=True)
+def show(event):
+    if event.kind in ("job", "skipped"):
+        queue_list.delete(0)
+    if event.kind in ("skipped", "done", "error"):
+        open_jobs.remove(event.data["job"])
 
-        messagebox.showinfo("Success", "All scripts executed successfully.")
-    except subprocess.CalledProcessError as e:
-        messagebox.showerror("Error", f"Script failed: {e}")
+    if event.kind == "job":
+        progress_bar.configure(mode="indeterminate")
+        progress_bar.start()
+    elif event.kind == "match":
+        progress_bar.stop()
+        progress_bar.configure(mode="determinate", maximum=event.data["matches"], value=event.data["match"] - 1)
+    elif event.kind == "ingested":
+        progress_bar.step(1)
+    elif event.kind in ("done", "error"):
+        progress_bar.stop()
+        progress_bar.configure(mode="determinate", value=0)
+
+    if event.kind == "done":
+        result = event.data["result"]
+        status = "Cancelled" if result.cancelled else "Done"
+        log(f"✅ {status}: {len(result.match_ids)} match(es) imported in {result.timings.total():.1f}s")
+        log("   " + ", ".join(f"{name} {seconds:.2f}s" for name, seconds in result.timings.seconds.items()))
+    elif event.kind == "error":
+        log(f"❌ {event.message}")
+    else:
+        log(event.message)
+    status_label.configure(text=event.message or "Idle")
+
+def poll_events():
+    while True:
+        try:
+            show(events.get_nowait())
+        except queue.Empty:
+            break
+    root.after(POLL_MS, poll_events)
 
 # GUI Setup
 root = tk.Tk()
 root.title("Score Updater")
 
-tk.Label(root, text="Match URL:").pack(pady=(10,0))
-url_entry = tk.Entry(root, width=50)
-url_entry.pack()
+tk.Label(root, text="Match URLs (one per line):").pack(pady=(10,0))
+url_text = tk.Text(root, width=70, height=4)
+url_text.pack(padx=10)
 
 tk.Label(root, text="Venue ID:").pack(pady=(10,0))
 venue_entry = tk.Entry(root, width=20)
 venue_entry.pack()
 
-tk.Button(root, text="Run Scripts", command=run_scripts).pack(pady=20)
+buttons = tk.Frame(root)
+buttons.pack(pady=10)
+tk.Button(buttons, text="Add to Queue", command=queue_import).pack(side=tk.LEFT, padx=5)
+tk.Button(buttons, text="Cancel", command=cancel_import).pack(side=tk.LEFT, padx=5)
+
+tk.Label(root, text="Queued:").pack()
+queue_list = tk.Listbox(root, width=80, height=4)
+queue_list.pack(padx=10)
+
+status_label = tk.Label(root, text="Idle")
+status_label.pack(pady=(10,0))
+progress_bar = ttk.Progressbar(root, length=500)
+progress_bar.pack(pady=5)
+
+log_text = tk.Text(root, width=80, height=12, state=tk.DISABLED)
+log_text.pack(padx=10, pady=(0,10))
+
+threading.Thread(target=worker, daemon=True).start()
+poll_events()
 
 root.mainloop()
@@ -1,75 +1,18 @@
 import streamlit as st
-import sqlite3
-import pandas as pd
+
+import dashboard_data
+import standings
 
 # --- Page config ---
 st.set_page_config(page_title="WYCO 2025 Season Standings as of 8/23/2025", layout="centered")
 st.title("WYCO 2025 Season Standings as of 8/23/2025")
 
-# --- Connect to the database ---
-db_path = "allshooters_prs.db"
-conn = sqlite3.connect(db_path)
-
-# --- Venue ID to Name Mapping ---
-venue_names = {
-    1: "Cheyenne",
-    2: "Laramie",
-    3: "Pawnee",
-    4: "Larkspur",
-    5: "Rawlins"
-}
-
-# --- Query base shooter data ---
-query_base = """
-SELECT
-    s.shooter_id,
-    s.name AS shooter_name,
-    s.classification,
-    s.wyco_points
-FROM shooters s
-WHERE s.wyco_points IS NOT NULL
-AND s.wyco_number IS NOT NULL
-AND s.membership_active = 1
-"""
-df = pd.read_sql_query(query_base, conn)
-
-# --- Query top match-level score per shooter per venue ---
-query_scores = """
-SELECT
-    sc.shooter_id,
-    m.venue_id,
-    MAX(sc.percentage) AS top_score
-FROM scores sc
-JOIN matches m ON sc.match_id = m.match_id
-WHERE sc.stage_name = 'Overall'
-GROUP BY sc.shooter_id, m.venue_id
-"""
-venue_scores = pd.read_sql_query(query_scores, conn)
-
-# --- Pivot venue scores to wide format ---
-venue_wide = venue_scores.pivot(index="shooter_id", columns="venue_id", values="top_score")
-venue_wide.rename(columns={vid: f"Top {vname}" for vid, vname in venue_names.items()}, inplace=True)
-venue_wide.reset_index(inplace=True)
-
-# --- Merge with leaderboard ---
-df = df.merge(venue_wide, on="shooter_id", how="left")
-
-# --- Ensure all expected venue columns exist ---
-expected_venue_cols = [f"Top {v}" for v in venue_names.values()]
-for col in expected_venue_cols:
-    if col not in df.columns:
-        df[col] = None
-
-# --- Sort by WYCO points ---
-df = df.sort_values(by="wyco_points", ascending=False).reset_index(drop=True)
-
-# --- Add Rank column ---
-df.insert(0, "Rank", range(1, len(df) + 1))
-
-# --- Filter by classification ---
+# --- Leaderboard: precomputed by standings.refresh() after every points/classification run ---
 class_filter = st.selectbox("Filter by classification:", options=["All", "A", "B", "C", "Unclassified"])
-if class_filter != "All":
-    df = df[df["classification"] == class_filter].copy()
+df = dashboard_data.leaderboard(None if class_filter == "All" else class_filter)
+df.rename(columns={"rank": "Rank"}, inplace=True)
+df.rename(columns={col: f"Top {standings.VENUE_NAMES[vid]}" for vid, col in standings.VENUE_COLUMNS.items()}, inplace=True)
+expected_venue_cols = [f"Top {v}" for v in standings.VENUE_NAMES.values()]
 
 # --- Highlight by classification ---
 def highlight_class(row):
@@ -96,6 +39,3 @@ st.markdown("""
 - 🔍 Use the filter to narrow results, but rankings reflect full leaderboard order  
 - ✨ WYCO points = sum of your best score at your top 3 venues
 """)
-
-# --- Cleanup ---
-conn.close()
@@ -0,0 +1,216 @@
+import re
+from collections import defaultdict
+
+# Name resolution for shooters: "Rizzo, Tj" / "rizzo, TJ" / "Rizo, TJ" should all land on one shooter_id.
+# Candidates are only compared inside a block (same Soundex code of the last name), so matching a name
+# costs a handful of comparisons instead of one per shooter in the database.
+
+# Only same_person pairs (same last name, same first name or a listed nickname or initials for it) are mapped
+# automatically; a score is just how close a pair looks, for listing possible duplicates
+REVIEW = 0.85  # at or above: fix_duplicates lists the pair for a human to decide
+
+# "Smith, John" and "Smith, John Jr" are father and son, never one shooter
+SUFFIXES = {"JR", "SR", "II", "III", "IV"}
+# "TJ", "T.J.", "T J": initials for a first name (capitals as typed, so "Ed" or "Al" isn't mistaken for them)
+INITIALS_RE = re.compile(r"^(?:[A-Z]\.?\s*){1,3}$")
+
+# Common short forms; both sides are looked up so either spelling matches the other
+NICKNAMES = {
+    "ANDY": "ANDREW", "BEN": "BENJAMIN", "BILL": "WILLIAM", "BOB": "ROBERT", "BRAD": "BRADLEY",
+    "CHRIS": "CHRISTOPHER", "DAN": "DANIEL", "DANNY": "DANIEL", "DAVE": "DAVID", "DOUG": "DOUGLAS",
+    "ED": "EDWARD", "GREG": "GREGORY", "JAKE": "JACOB", "JIM": "JAMES", "JIMMY": "JAMES", "JOE": "JOSEPH",
+    "JOHNNY": "JOHN", "JON": "JONATHAN", "KEN": "KENNETH", "MATT": "MATTHEW", "MIKE": "MICHAEL",
+    "NATE": "NATHAN", "NICK": "NICHOLAS", "PAT": "PATRICK", "RICH": "RICHARD", "RICK": "RICHARD",
+    "ROB": "ROBERT", "SAM": "SAMUEL", "STEVE": "STEVEN", "TIM": "TIMOTHY", "TOM": "THOMAS",
+    "TONY": "ANTHONY", "ZACH": "ZACHARY",
+}
+
+SOUNDEX_CODES = {
+    **dict.fromkeys("BFPV", "1"), **dict.fromkeys("CGJKQSXZ", "2"), **dict.fromkeys("DT", "3"),
+    "L": "4", **dict.fromkeys("MN", "5"), "R": "6",
+}
+
+
+# --- Helper: Normalize shooter name (what fix_duplicates has always grouped on) ---
+def normalize_name(name: str) -> str:
+    parts = [part.strip().capitalize() for part in name.split(",")]
+    if len(parts) == 2:
+        return f"{parts[0]}, {parts[1]}"
+    return name.strip().title()
+
+
+def split_name(name):
+    # PractiScore lists "Last, First"; anything else is taken as "First ... Last"
+    if "," in name:
+        last, first = name.split(",", 1)
+    else:
+        words = name.split()
+        last, first = (words[-1], " ".join(words[:-1])) if words else ("", "")
+    clean = lambda part: "".join(ch for ch in part.upper() if ch.isalpha() or ch == " ").strip()
+    return clean(last), clean(first)
+
+
+def name_parts(name):
+    # (last, first, suffixes, first name is initials), suffix words taken out wherever they were written
+    words = name.replace(",", " , ").split()
+    is_suffix = lambda word: word.upper().strip(".") in SUFFIXES
+    suffixes = frozenset(word.upper().strip(".") for word in words if is_suffix(word))
+    rest = " ".join(word for word in words if not is_suffix(word)).replace(" ,", ",")
+    raw_first = rest.split(",", 1)[1].strip() if "," in rest else " ".join(rest.split()[:-1])
+    last, first = split_name(rest)
+    return last.replace(" ", ""), first, suffixes, bool(INITIALS_RE.match(raw_first))
+
+
+def soundex(word):
+    letters = [ch for ch in word.upper() if ch.isalpha()]
+    if not letters:
+        return ""
+    code = letters[0]
+    previous = SOUNDEX_CODES.get(letters[0], "")
+    for ch in letters[1:]:
+        digit = SOUNDEX_CODES.get(ch, "")
+        if digit and digit != previous:
+            code += digit
+            if len(code) == 4:
+                break
+        if ch not in "HW":
+            previous = digit
+    return code.ljust(4, "0")
+
+
+def block_key(name):
+    return soundex(name_parts(name)[0])
+
+
+def jaro_winkler(a, b):
+    if a == b:
+        return 1.0
+    if not a or not b:
+        return 0.0
+    window = max(max(len(a), len(b)) // 2 - 1, 0)
+    a_matched = [False] * len(a)
+    b_matched = [False] * len(b)
+    matches = 0
+    for i, ch in enumerate(a):
+        for j in range(max(0, i - window), min(len(b), i + window + 1)):
+            if not b_matched[j] and b[j] == ch:
+                a_matched[i] = b_matched[j] = True
+                matches += 1
+                break
+    if not matches:
+        return 0.0
+    a_chars = [ch for ch, hit in zip(a, a_matched) if hit]
+    b_chars = [ch for ch, hit in zip(b, b_matched) if hit]
+    transpositions = sum(x != y for x, y in zip(a_chars, b_chars)) / 2
+    jaro = (matches / len(a) + matches / len(b) + (matches - transpositions) / matches) / 3
+    prefix = 0
+    for x, y in zip(a[:4], b[:4]):
+        if x != y:
+            break
+        prefix += 1
+    return jaro + prefix * 0.1 * (1 - jaro)
+
+
+def expands_initials(initials, first):
+    # "TJ" / "Thomas", "T" / "Thomas": the first initial starts the full name
+    letters = initials.replace(" ", "")
+    return bool(letters) and len(first.replace(" ", "")) > len(letters) and first.startswith(letters[0])
+
+
+def same_first_name(a, b):
+    # a, b: name_parts(). Same name, a listed nickname ("Chris" / "Christopher") or initials for it
+    first_a, initials_a = a[1], a[3]
+    first_b, initials_b = b[1], b[3]
+    if first_a == first_b or NICKNAMES.get(first_a, first_a) == NICKNAMES.get(first_b, first_b):
+        return True
+    return (initials_a and not initials_b and expands_initials(first_a, first_b)) or \
+        (initials_b and not initials_a and expands_initials(first_b, first_a))
+
+
+def first_name_similarity(a, b):
+    if a[1] == b[1]:
+        return 1.0
+    if same_first_name(a, b):
+        return 0.97
+    return jaro_winkler(a[1], b[1])
+
+
+def name_similarity(a, b):
+    # A pair is only as close as its least similar part: "Miller, Nathan" / "Miller, Jonathon" share a family
+    # name and nothing else. Different suffixes (Jr/Sr/II) are different people outright
+    parts_a, parts_b = name_parts(a), name_parts(b)
+    if parts_a[2] != parts_b[2]:
+        return 0.0
+    return min(jaro_winkler(parts_a[0], parts_b[0]), first_name_similarity(parts_a, parts_b))
+
+
+def same_person(a, b):
+    # Safe to map without asking: same last name (spacing/punctuation aside), same suffixes, and the same first
+    # name, a nickname of it or its initials. "Chris" / "Christine", "Ryan" / "Bryan" or "Andersen" / "Anderson"
+    # look alike but are usually different people, so they go to a human
+    parts_a, parts_b = name_parts(a), name_parts(b)
+    return parts_a[0] == parts_b[0] and parts_a[2] == parts_b[2] and same_first_name(parts_a, parts_b)
+
+
+class IdentityResolver:
+    # --- Shooter names, aliases and blocks, loaded once per run ---
+    def __init__(self, conn):
+        self.conn = conn
+        self.reload()
+
+    def reload(self):
+        self.names = {}
+        self.blocks = defaultdict(list)
+        # Descending so duplicate names keep their oldest shooter_id
+        for shooter_id, name in self.conn.execute("SELECT shooter_id, name FROM shooters ORDER BY shooter_id DESC"):
+            self.names[name] = shooter_id
+        for name, shooter_id in self.names.items():
+            self.blocks[block_key(name)].append((shooter_id, name))
+        self.aliases = dict(self.conn.execute("SELECT alias, shooter_id FROM shooter_aliases"))
+
+    def add(self, shooter_id, name):
+        self.names[name] = shooter_id
+        self.blocks[block_key(name)].append((shooter_id, name))
+
+    def candidates(self, name, threshold=REVIEW, exclude=()):
+        # Existing shooters in the same block scoring at or above threshold, best first
+        scored = [
+            (name_similarity(name, other), shooter_id, other)
+            for shooter_id, other in self.blocks.get(block_key(name), [])
+            if other != name and shooter_id not in exclude
+        ]
+        return sorted((c for c in scored if c[0] >= threshold), key=lambda c: (-c[0], c[1]))
+
+    def match(self, name, exclude=()):
+        # shooter_id for a name: exact, then a recorded alias, then the one existing shooter it can only be
+        # (same_person; alias recorded). Two or more such shooters is a guess, so none is returned.
+        # Shooters in exclude are never returned.
+        for known in (self.names, self.aliases):
+            if name in known:
+                return known[name] if known[name] not in exclude else None
+        best = [c for c in self.candidates(name, REVIEW, exclude) if same_person(name, c[2])]
+        if len({shooter_id for _, shooter_id, _ in best}) == 1:
+            score, shooter_id, other = best[0]
+            self.record_alias(name, shooter_id, "name", score)
+            print(f"🔗 '{name}' matched to existing shooter '{other}' ({score:.2f})")
+            return shooter_id
+        return None
+
+    def record_alias(self, alias, shooter_id, source, score=None):
+        self.aliases[alias] = shooter_id
+        self.conn.execute("""
+            INSERT OR REPLACE INTO shooter_aliases (alias, shooter_id, source, score)
+            VALUES (?, ?, ?, ?)
+        """, (alias, shooter_id, source, score))
+
+    def duplicate_pairs(self, threshold=REVIEW):
+        # Every pair of shooters within a block scoring at or above threshold, best first
+        pairs = []
+        for members in self.blocks.values():
+            members = sorted(members)
+            for i, (id_a, name_a) in enumerate(members):
+                for id_b, name_b in members[i + 1:]:
+                    score = name_similarity(name_a, name_b)
+                    if score >= threshold:
+                        pairs.append((score, id_a, name_a, id_b, name_b))
+        return sorted(pairs, key=lambda p: (-p[0], p[1], p[3]))
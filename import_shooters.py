@@ -1,51 +1,144 @@
+import argparse
 import sqlite3
+
 import pandas as pd
 
-# --- Load the CSV ---
+import classify_shooters
+import identity
+import migrations
+import scoring
+import standings
+
 csv_path = "wyconumbers.csv"
-df = pd.read_csv(csv_path)
+db_path = "allshooters_prs.db"
 
-# Normalize headers
-df.columns = df.columns.str.strip().str.lower()
+# What the sync did to each roster row, plus 'unmatched': numbered shooters the roster no longer lists (left alone)
+CHANGES = ["new", "activated", "deactivated", "renumbered", "unchanged", "unmatched"]
 
-# Format name: "Last, First"
-df['formatted_name'] = df['member_last_name'].str.strip() + ", " + df['member_first_name'].str.strip()
 
-# Convert status to 1 = active, 0 = inactive
-df['membership_active'] = df['membership_status'].str.strip().str.lower().map(lambda status: 1 if status == 'active' else 0)
+# --- Load the CSV: one row per member, name formatted like the DB ("Last, First") ---
+def load_roster(path):
+    df = pd.read_csv(path)
+    df.columns = df.columns.str.strip().str.lower()
+    return pd.DataFrame({
+        "name": df["member_last_name"].str.strip() + ", " + df["member_first_name"].str.strip(),
+        "wyco_number": df["user_id"].astype(str).str.strip(),
+        # 1 = active, 0 = inactive
+        "membership_active": df["membership_status"].str.strip().str.lower().eq("active").astype(int),
+    })
 
-# Connect to the database
-db_path = "allshooters_prs.db"
-conn = sqlite3.connect(db_path)
-cursor = conn.cursor()
-
-inserted = 0
-updated = 0
-
-for _, row in df.iterrows():
-    name = row['formatted_name']
-    wyco_number = row['user_id']
-    is_active = int(row['membership_active'])
-
-    # Check if shooter exists by name
-    cursor.execute("SELECT shooter_id FROM shooters WHERE name = ?", (name,))
-    result = cursor.fetchone()
-
-    if result:
-        cursor.execute("""
-            UPDATE shooters
-            SET wyco_number = ?, membership_active = ?
-            WHERE name = ?
-        """, (wyco_number, is_active, name))
-        updated += 1
-    else:
-        cursor.execute("""
-            INSERT INTO shooters (name, wyco_number, membership_active, wyco_points, classification)
-            VALUES (?, ?, ?, 0, '')
-        """, (name, wyco_number, is_active))
-        inserted += 1
-
-conn.commit()
-conn.close()
-
-print(f"✅ WYCO data imported: {inserted} new, {updated} updated.")
+
+def stage_roster(conn, roster):
+    # temp.roster gets the shooter each row belongs to: exact name, then a recorded alias (merged or
+    # fuzzy-matched spelling), then the WYCO number, then the name ignoring capitalization/spacing
+    conn.create_function("normalize_name", 1, identity.normalize_name, deterministic=True)
+    conn.execute("DROP TABLE IF EXISTS temp.roster")
+    conn.execute("""
+        CREATE TEMP TABLE roster (
+            row_no INTEGER PRIMARY KEY, name TEXT, norm_name TEXT, wyco_number TEXT, membership_active INTEGER,
+            shooter_id INTEGER
+        )
+    """)
+    conn.executemany(
+        "INSERT INTO roster (name, norm_name, wyco_number, membership_active) VALUES (?, normalize_name(?), ?, ?)",
+        [(row.name, row.name, row.wyco_number, int(row.membership_active)) for row in roster.itertuples(index=False)]
+    )
+    conn.execute("DROP TABLE IF EXISTS temp.shooter_keys")
+    conn.execute("CREATE TEMP TABLE shooter_keys AS SELECT shooter_id, normalize_name(name) AS norm_name FROM shooters")
+    conn.execute("CREATE INDEX temp.idx_shooter_keys ON shooter_keys(norm_name)")
+    conn.execute("""
+        UPDATE roster SET shooter_id = COALESCE(
+            (SELECT shooter_id FROM shooters WHERE name = roster.name),
+            (SELECT shooter_id FROM shooter_aliases WHERE alias = roster.name),
+            (SELECT MIN(shooter_id) FROM shooters WHERE wyco_number = roster.wyco_number),
+            (SELECT MIN(shooter_id) FROM shooter_keys WHERE norm_name = roster.norm_name)
+        )
+    """)
+
+
+def roster_diff(conn):
+    # Every roster row against the shooter it landed on, and numbered shooters no row landed on
+    return pd.read_sql_query("""
+        SELECT r.shooter_id, COALESCE(s.name, r.name) AS name,
+               s.wyco_number AS old_wyco_number, r.wyco_number,
+               s.membership_active AS old_active, r.membership_active,
+               CASE
+                   WHEN s.shooter_id IS NULL THEN 'new'
+                   WHEN r.membership_active = 1 AND s.membership_active IS NOT 1 THEN 'activated'
+                   WHEN r.membership_active = 0 AND s.membership_active = 1 THEN 'deactivated'
+                   WHEN s.wyco_number IS NOT r.wyco_number THEN 'renumbered'
+                   ELSE 'unchanged'
+               END AS change
+        FROM roster r
+        LEFT JOIN shooters s ON s.shooter_id = r.shooter_id
+        UNION ALL
+        SELECT s.shooter_id, s.name, s.wyco_number, NULL, s.membership_active, NULL, 'unmatched'
+        FROM shooters s
+        WHERE NULLIF(s.wyco_number, '') IS NOT NULL
+        AND s.shooter_id NOT IN (SELECT shooter_id FROM roster WHERE shooter_id IS NOT NULL)
+    """, conn)
+
+
+def membership_changed(diff):
+    # Shooters moving in or out of what scoring/classification count as members (numbered and active).
+    # A new roster row counts too when it's an active member: they belong on the leaderboard straight away
+    matched = diff[diff["change"].isin(["new", "activated", "deactivated", "renumbered"])]
+    was_member = matched["old_wyco_number"].notna() & matched["old_active"].eq(1)
+    return matched.loc[was_member != matched["membership_active"].eq(1), "shooter_id"].astype(int).tolist()
+
+
+def sync(conn, roster):
+    # Roster into the DB in one statement; returns the diff and refreshes only shooters whose membership changed
+    with conn:
+        conn.execute("BEGIN")  # temp table DDL doesn't open a transaction implicitly
+        stage_roster(conn, roster)
+        diff = roster_diff(conn)
+        conn.execute("""
+            INSERT INTO shooters (shooter_id, name, wyco_number, membership_active, wyco_points, classification)
+            SELECT r.shooter_id, COALESCE(s.name, r.name), r.wyco_number, r.membership_active, 0, ''
+            FROM roster r
+            LEFT JOIN shooters s ON s.shooter_id = r.shooter_id
+            WHERE true  -- keeps ON CONFLICT from parsing as a join constraint
+            ORDER BY r.row_no
+            ON CONFLICT(shooter_id) DO UPDATE SET
+                wyco_number = excluded.wyco_number, membership_active = excluded.membership_active
+                WHERE wyco_number IS NOT excluded.wyco_number OR membership_active IS NOT excluded.membership_active
+            ON CONFLICT(name) DO UPDATE SET
+                wyco_number = excluded.wyco_number, membership_active = excluded.membership_active
+        """)
+        # New shooters get their IDs now, so the diff can show them
+        new = diff["change"] == "new"
+        if new.any():
+            ids = dict(conn.execute("SELECT name, shooter_id FROM shooters"))
+            diff.loc[new, "shooter_id"] = diff.loc[new, "name"].map(ids)
+        conn.execute("DROP TABLE temp.roster")
+        conn.execute("DROP TABLE temp.shooter_keys")
+
+    changed = membership_changed(diff)
+    if changed:
+        scoring.recalculate_totals(conn, changed)
+        classify_shooters.reclassify(conn, changed)
+        standings.refresh(conn)
+    return diff
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sync WYCO members from the club roster CSV")
+    parser.add_argument("--csv", default=csv_path, help="roster export (default: %(default)s)")
+    parser.add_argument("--db", default=db_path, help="database to update (default: %(default)s)")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    migrations.migrate(conn)
+    diff = sync(conn, load_roster(args.csv))
+    conn.close()
+
+    counts = diff["change"].value_counts()
+    print(f"✅ WYCO data imported: {counts.get('new', 0)} new, {counts.get('activated', 0)} activated, "
+          f"{counts.get('deactivated', 0)} deactivated, {counts.get('renumbered', 0)} renumbered, "
+          f"{counts.get('unchanged', 0)} unchanged.")
+    for change, emoji in [("new", "🆕"), ("activated", "🟢"), ("deactivated", "🔴"), ("renumbered", "🔢")]:
+        for row in diff[diff["change"] == change].itertuples():
+            print(f"{emoji} {row.name} (#{row.wyco_number})")
+    for row in diff[diff["change"] == "unmatched"].itertuples():
+        print(f"⚠️ Not on the roster: {row.name} (#{row.old_wyco_number})")
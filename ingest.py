@@ -0,0 +1,127 @@
+import time
+
+import identity
+import stage_results
+
+NAME_CHUNK = 500
+
+
+class BulkIngestor:
+    # --- Writes a whole match (overall + stages) in one transaction with executemany ---
+    def __init__(self, conn):
+        self.conn = conn
+        self.rows_written = 0
+        self.shooters_added = 0
+        self.pending_shooters = 0
+        self.seconds = 0.0
+        self.match_ids = []
+
+        # Loaded once per run. Descending so duplicate names keep their oldest shooter_id,
+        # the same row a "WHERE name = ?" lookup used to hit first.
+        self.shooter_ids = {}
+        for shooter_id, name in conn.execute("SELECT shooter_id, name FROM shooters ORDER BY shooter_id DESC"):
+            self.shooter_ids[name] = shooter_id
+        self.identity = identity.IdentityResolver(conn)
+
+    def resolve_shooters(self, names):
+        names = list(dict.fromkeys(names))
+        # Everyone on one results page is a different person, so a shooter already on it can't be matched twice
+        taken = {self.shooter_ids[name] for name in names if name in self.shooter_ids}
+        new_names = []
+        for name in names:
+            if name in self.shooter_ids:
+                continue
+            # A known alias or a close enough spelling of an existing shooter isn't a new shooter
+            shooter_id = self.identity.match(name, exclude=taken)
+            if shooter_id is not None:
+                self.shooter_ids[name] = shooter_id
+                taken.add(shooter_id)
+            else:
+                new_names.append(name)
+        if not new_names:
+            return
+        self.pending_shooters += len(new_names)
+        self.conn.executemany("""
+            INSERT INTO shooters (name, wyco_number, wyco_points, classification, membership_active)
+            VALUES (?, '', 0, '', 0)
+        """, [(name,) for name in new_names])
+        for start in range(0, len(new_names), NAME_CHUNK):
+            chunk = new_names[start:start + NAME_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            for shooter_id, name in self.conn.execute(
+                f"SELECT shooter_id, name FROM shooters WHERE name IN ({placeholders}) ORDER BY shooter_id DESC", chunk
+            ):
+                self.shooter_ids[name] = shooter_id
+                self.identity.add(shooter_id, name)
+
+    def write_stages(self, match_id, stages):
+        # stages: (stage_no, stage_name, shooter_data), stage_no 0 being the Overall results
+        existing = {row[0] for row in self.conn.execute(
+            "SELECT stage_no FROM stages WHERE match_id = ?", (match_id,)
+        )}
+        stage_rows = []
+        score_rows = []
+        detail_rows = []
+        # Ids handed out here so each stage_results row can point at its score without a lookup per row.
+        # Safe because the match INSERT before this already holds the write lock
+        score_id = self.conn.execute("""
+            SELECT MAX(COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'scores'), 0),
+                       COALESCE((SELECT MAX(score_id) FROM scores), 0))
+        """).fetchone()[0]
+        for stage_no, stage_name, shooter_data in stages:
+            # ✅ Skip stage if already present
+            if stage_no in existing:
+                print(f"⏩ Stage '{stage_name}' already exists. Skipping.")
+                continue
+            stage_rows.append((match_id, stage_no, stage_name, int(stage_no == 0)))
+            self.resolve_shooters(row[0] for row in shooter_data)
+            for name, place, percentage, points, detail in shooter_data:
+                score_id += 1
+                score_rows.append((score_id, match_id, self.shooter_ids[name], stage_no, place, percentage, points))
+                if detail:
+                    detail_rows.append(stage_results.detail_row(score_id, detail))
+
+        self.conn.executemany("""
+            INSERT INTO stages (match_id, stage_no, name, is_overall)
+            VALUES (?, ?, ?, ?)
+        """, stage_rows)
+        self.conn.executemany("""
+            INSERT INTO scores (score_id, match_id, shooter_id, stage_no, place, percentage, points)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, score_rows)
+        self.conn.executemany(f"""
+            INSERT INTO stage_results (score_id, {", ".join(stage_results.FIELDS)})
+            VALUES ({", ".join("?" * (len(stage_results.FIELDS) + 1))})
+        """, detail_rows)
+        return len(score_rows)
+
+    def ingest_match(self, match_name, match_date, venue_id, match_uuid, match_url, stages):
+        start = time.perf_counter()
+        known_names = set(self.shooter_ids)
+        self.pending_shooters = 0
+        try:
+            with self.conn:
+                cur = self.conn.execute("""
+                    INSERT INTO matches (match_name, match_date, venue_id, practiscore_uuid, match_url)
+                    VALUES (?, ?, ?, ?, ?)
+                """, (match_name, match_date, venue_id, match_uuid, match_url))
+                match_id = cur.lastrowid
+                rows = self.write_stages(match_id, stages)
+        except Exception:
+            # The rollback took any new shooters and aliases with it, so forget their ids too
+            for name in set(self.shooter_ids) - known_names:
+                del self.shooter_ids[name]
+            self.identity.reload()
+            raise
+        self.rows_written += rows
+        self.shooters_added += self.pending_shooters
+        self.seconds += time.perf_counter() - start
+        self.match_ids.append(match_id)
+        return match_id
+
+    def rows_per_second(self):
+        return self.rows_written / self.seconds if self.seconds else 0.0
+
+    def report(self):
+        print(f"📥 Ingested {self.rows_written} score row(s) and {self.shooters_added} new shooter(s) "
+              f"in {self.seconds:.2f}s ({self.rows_per_second():,.0f} rows/sec)")
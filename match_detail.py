@@ -0,0 +1,56 @@
+from collections import namedtuple
+
+import pandas as pd
+
+OVERALL = 0  # stage_no of the Overall results
+
+# results: every score row of the match, Overall first then stages in number order
+# stages: stage names in number order (Overall left out)
+# points / percentage: one row per shooter (by overall place), one column per stage name plus "Overall"
+MatchDetail = namedtuple("MatchDetail", "results stages points percentage")
+
+
+# Ordered by stage number, so "Stage 10" comes after "Stage 9"
+RESULTS_QUERY = """
+    SELECT sc.shooter_id, s.name AS shooter, s.classification,
+           sc.stage_no, st.name AS stage_name, sc.place, sc.points, sc.percentage
+    FROM scores sc
+    JOIN stages st ON st.match_id = sc.match_id AND st.stage_no = sc.stage_no
+    JOIN shooters s ON sc.shooter_id = s.shooter_id
+    WHERE sc.match_id = ?
+    ORDER BY sc.stage_no, sc.score_id
+"""
+
+
+def load_results(conn, match_id):
+    return pd.read_sql_query(RESULTS_QUERY, conn, params=(int(match_id),))
+
+
+def stage_matrix(results, value):
+    # A shooter imported twice for the same stage keeps their first row
+    first = results.drop_duplicates(["shooter_id", "stage_no"], keep="first")
+    matrix = first.pivot(index=["shooter_id", "shooter"], columns="stage_no", values=value)
+    # Rows in overall finishing order, anyone missing from the Overall page last
+    overall_place = first[first["stage_no"] == OVERALL].set_index("shooter_id")["place"]
+    place = pd.Series(matrix.index.get_level_values("shooter_id").map(overall_place))
+    matrix = matrix.iloc[place.sort_values(kind="stable", na_position="last").index]
+    names = first.drop_duplicates("stage_no").set_index("stage_no")["stage_name"]
+    matrix = matrix.rename(columns=names).reset_index(level=0, drop=True)
+    matrix.columns.name = None
+    return matrix
+
+
+def load(conn, match_id):
+    results = load_results(conn, match_id)
+    stages = results.loc[results["stage_no"] != OVERALL, "stage_name"].drop_duplicates().tolist()
+    return MatchDetail(results, stages, stage_matrix(results, "points"), stage_matrix(results, "percentage"))
+
+
+def overall(detail):
+    results = detail.results[detail.results["stage_no"] == OVERALL]
+    return results.sort_values("place", kind="stable").reset_index(drop=True)
+
+
+def stage(detail, stage_name):
+    results = detail.results[detail.results["stage_name"] == stage_name]
+    return results.sort_values("percentage", ascending=False, kind="stable").reset_index(drop=True)
@@ -1,18 +1,21 @@
 import sqlite3
 
+import merge_shooters
+import migrations
+
 correct_id = 85     # "Rizzo, TJ"
 duplicate_id = 34  # "Rizzo, Thomas"
 
 conn = sqlite3.connect("allshooters_prs.db")
-cursor = conn.cursor()
-
-# Reassign scores from duplicate to correct
-cursor.execute("UPDATE scores SET shooter_id = ? WHERE shooter_id = ?", (correct_id, duplicate_id))
-
-# Remove duplicate shooter
-cursor.execute("DELETE FROM shooters WHERE shooter_id = ?", (duplicate_id,))
+migrations.migrate(conn)
 
-conn.commit()
-conn.close()
+# Scores, achievements, aliases and class history all move; refuses if either ID is gone
+try:
+    merge_shooters.merge(conn, {duplicate_id: correct_id})
+except merge_shooters.MergeError as e:
+    print(f"❌ Nothing merged: {e}")
+    raise SystemExit(1)
+finally:
+    conn.close()
 
 print(f"✅ Merged shooter ID {duplicate_id} into {correct_id}")
@@ -0,0 +1,204 @@
+import argparse
+import sqlite3
+from collections import namedtuple
+
+import classify_shooters
+import migrations
+import scoring
+import shooter_stats
+import standings
+
+# Folding duplicate shooter profiles into one. The whole mapping is applied in one transaction
+# with set-based statements, so a failure part way leaves the database exactly as it was.
+db_path = "allshooters_prs.db"
+
+MergeSummary = namedtuple("MergeSummary", "shooters scores_moved score_conflicts achievements_moved achievement_conflicts")
+
+# Every shooter in a merge (duplicates and primaries) next to the primary it ends up as
+MERGE_GROUPS = """
+    SELECT duplicate_id AS shooter_id, primary_id FROM merge_map
+    UNION
+    SELECT primary_id, primary_id FROM merge_map
+"""
+
+
+class MergeError(Exception):
+    pass
+
+
+def resolve_mapping(mapping):
+    # Follow chains ({a: b, b: c} sends a and b to c); a cycle has no primary to land on
+    resolved = {}
+    for duplicate_id in mapping:
+        seen = [int(duplicate_id)]
+        primary_id = int(mapping[duplicate_id])
+        while primary_id in mapping:
+            if primary_id in seen:
+                raise MergeError(f"shooters {sorted(seen)} are merged into each other")
+            seen.append(primary_id)
+            primary_id = int(mapping[primary_id])
+        if primary_id != int(duplicate_id):
+            resolved[int(duplicate_id)] = primary_id
+    return resolved
+
+
+def check_shooters(conn, mapping):
+    ids = set(mapping) | set(mapping.values())
+    known = {row[0] for row in conn.execute(
+        f"SELECT shooter_id FROM shooters WHERE shooter_id IN ({','.join('?' * len(ids))})", list(ids)
+    )}
+    missing = sorted(ids - known)
+    if missing:
+        raise MergeError(f"no shooter with ID {', '.join(map(str, missing))}")
+
+
+def merge_rows(conn, mapping):
+    conn.execute("DROP TABLE IF EXISTS temp.merge_map")
+    conn.execute("CREATE TEMP TABLE merge_map (duplicate_id INTEGER PRIMARY KEY, primary_id INTEGER NOT NULL)")
+    conn.executemany("INSERT INTO merge_map VALUES (?, ?)", mapping.items())
+    duplicates = "SELECT duplicate_id FROM merge_map"
+    primary_of = "(SELECT primary_id FROM merge_map WHERE duplicate_id = {}.shooter_id)"
+
+    # --- Scores: the same person entered twice in one match keeps one row per stage ---
+    # Best points win, then best place, then the row imported first. Only groups mixing rows from
+    # different profiles are touched; repeats under a single profile are left as they were.
+    score_conflicts = conn.execute(f"""
+        DELETE FROM scores WHERE score_id IN (
+            SELECT score_id FROM (
+                SELECT sc.score_id,
+                       ROW_NUMBER() OVER ranked AS pick,
+                       MIN(sc.shooter_id) OVER grp != MAX(sc.shooter_id) OVER grp AS mixed
+                FROM scores sc
+                JOIN ({MERGE_GROUPS}) g ON g.shooter_id = sc.shooter_id
+                WINDOW grp AS (PARTITION BY g.primary_id, sc.match_id, sc.stage_no),
+                       ranked AS (grp ORDER BY sc.points IS NULL, sc.points DESC, sc.place IS NULL, sc.place, sc.score_id)
+            )
+            WHERE pick > 1 AND mixed
+        )
+    """).rowcount
+    scores_moved = conn.execute(f"""
+        UPDATE scores SET shooter_id = {primary_of.format('scores')}
+        WHERE shooter_id IN ({duplicates})
+    """).rowcount
+
+    # --- Achievements: one per (shooter, match, achievement), the primary's own row first ---
+    achievement_conflicts = conn.execute(f"""
+        DELETE FROM achievements WHERE id IN (
+            SELECT id FROM (
+                SELECT a.id,
+                       ROW_NUMBER() OVER (
+                           PARTITION BY g.primary_id, a.match_id, a.achievement
+                           ORDER BY a.shooter_id != g.primary_id, a.id
+                       ) AS pick
+                FROM achievements a
+                JOIN ({MERGE_GROUPS}) g ON g.shooter_id = a.shooter_id
+            )
+            WHERE pick > 1
+        )
+    """).rowcount
+    achievements_moved = conn.execute(f"""
+        UPDATE achievements SET shooter_id = {primary_of.format('achievements')}
+        WHERE shooter_id IN ({duplicates})
+    """).rowcount
+
+    # --- Aliases: earlier spellings follow the primary, and the duplicate's name becomes one ---
+    conn.execute(f"""
+        UPDATE shooter_aliases SET shooter_id = {primary_of.format('shooter_aliases')}
+        WHERE shooter_id IN ({duplicates})
+    """)
+    conn.execute("""
+        INSERT OR REPLACE INTO shooter_aliases (alias, shooter_id, source)
+        SELECT s.name, m.primary_id, 'merge'
+        FROM shooters s
+        JOIN merge_map m ON m.duplicate_id = s.shooter_id
+    """)
+
+    # --- Classification: history is kept under the primary, stored windows are rebuilt afterwards ---
+    conn.execute(f"""
+        UPDATE classification_history SET shooter_id = {primary_of.format('classification_history')}
+        WHERE shooter_id IN ({duplicates})
+    """)
+    conn.execute(f"DELETE FROM classification_state WHERE shooter_id IN (SELECT shooter_id FROM ({MERGE_GROUPS}))")
+
+    # --- Derived rows for the duplicates go; the primaries' are refreshed afterwards ---
+    conn.execute(f"DELETE FROM standings WHERE shooter_id IN ({duplicates})")
+    conn.execute(f"DELETE FROM shooter_stats WHERE shooter_id IN ({duplicates})")
+
+    # --- Shooter rows: the primary keeps its own details, gaps are filled from duplicates in ID order ---
+    conn.execute("""
+        UPDATE shooters SET
+            wyco_number = COALESCE(NULLIF(wyco_number, ''), (
+                SELECT d.wyco_number FROM shooters d JOIN merge_map m ON m.duplicate_id = d.shooter_id
+                WHERE m.primary_id = shooters.shooter_id AND NULLIF(d.wyco_number, '') IS NOT NULL
+                ORDER BY d.shooter_id LIMIT 1
+            ), wyco_number),
+            classification = COALESCE(NULLIF(classification, ''), (
+                SELECT d.classification FROM shooters d JOIN merge_map m ON m.duplicate_id = d.shooter_id
+                WHERE m.primary_id = shooters.shooter_id AND NULLIF(d.classification, '') IS NOT NULL
+                ORDER BY d.shooter_id LIMIT 1
+            ), classification),
+            membership_active = COALESCE(membership_active, (
+                SELECT d.membership_active FROM shooters d JOIN merge_map m ON m.duplicate_id = d.shooter_id
+                WHERE m.primary_id = shooters.shooter_id AND d.membership_active IS NOT NULL
+                ORDER BY d.shooter_id LIMIT 1
+            ))
+        WHERE shooter_id IN (SELECT primary_id FROM merge_map)
+    """)
+    shooters = conn.execute(f"DELETE FROM shooters WHERE shooter_id IN ({duplicates})").rowcount
+    conn.execute("DROP TABLE temp.merge_map")
+    return MergeSummary(shooters, scores_moved, score_conflicts, achievements_moved, achievement_conflicts)
+
+
+def refresh(conn, primary_ids):
+    # Points, class, standings and stats for just the shooters that gained results
+    primary_ids = sorted(primary_ids)
+    match_ids = [row[0] for row in conn.execute(f"""
+        SELECT DISTINCT match_id FROM scores
+        WHERE stage_no = 0 AND shooter_id IN ({','.join('?' * len(primary_ids))})
+    """, primary_ids)]
+    if match_ids:
+        scoring.recalculate(conn, match_ids)
+    classify_shooters.reclassify(conn, primary_ids)
+    standings.refresh(conn)
+    shooter_stats.refresh(conn, primary_ids)
+
+
+def merge(conn, mapping):
+    # mapping: {duplicate shooter_id: primary shooter_id}
+    mapping = resolve_mapping(mapping)
+    if not mapping:
+        return MergeSummary(0, 0, 0, 0, 0)
+    check_shooters(conn, mapping)
+    with conn:
+        conn.execute("BEGIN")  # the temp table DDL doesn't open a transaction implicitly
+        summary = merge_rows(conn, mapping)
+    refresh(conn, set(mapping.values()))
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Merge duplicate shooter profiles")
+    parser.add_argument("pairs", nargs="+", metavar="DUPLICATE:PRIMARY", help="shooter IDs, e.g. 34:85")
+    parser.add_argument("--db", default=db_path, help="database to update (default: %(default)s)")
+    args = parser.parse_args()
+
+    try:
+        mapping = {int(dup): int(primary) for dup, primary in (pair.split(":") for pair in args.pairs)}
+    except ValueError:
+        parser.error("pairs look like DUPLICATE:PRIMARY, e.g. 34:85")
+
+    conn = sqlite3.connect(args.db)
+    migrations.migrate(conn)
+    try:
+        summary = merge(conn, mapping)
+    except MergeError as e:
+        print(f"❌ Nothing merged: {e}")
+        raise SystemExit(1)
+    finally:
+        conn.close()
+
+    print(f"✅ Merged {summary.shooters} shooter profiles: {summary.scores_moved} scores and "
+          f"{summary.achievements_moved} achievements moved")
+    if summary.score_conflicts or summary.achievement_conflicts:
+        print(f"🧹 Dropped {summary.score_conflicts} scores and {summary.achievement_conflicts} achievements "
+              f"the primary already had")
@@ -0,0 +1,333 @@
+import sqlite3
+import sys
+
+DB_PATH = "allshooters_prs.db"
+
+
+class MigrationError(Exception):
+    pass
+
+
+def columns(conn, table):
+    return {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+
+def add_column(conn, table, column, col_type):
+    if column not in columns(conn, table):
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {col_type}")
+
+
+# --- Migration 1: base tables, as scraperv2 used to create them ---
+def base_schema(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS matches (
+            match_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            match_name TEXT,
+            match_date TEXT,
+            venue_id INTEGER
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS shooters (
+            shooter_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT,
+            wyco_number TEXT,
+            wyco_points REAL,
+            classification TEXT,
+            membership_active INTEGER
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS scores (
+            score_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            match_id INTEGER,
+            shooter_id INTEGER,
+            stage_name TEXT,
+            place INTEGER,
+            percentage REAL,
+            points REAL,
+            FOREIGN KEY(match_id) REFERENCES matches(match_id),
+            FOREIGN KEY(shooter_id) REFERENCES shooters(shooter_id)
+        )
+    """)
+
+
+# --- Migration 2: columns pointsv2 / classify_shooters / scraperv2 used to ALTER in on the fly ---
+def wyco_and_practiscore_columns(conn):
+    add_column(conn, "scores", "wyco_points", "REAL")
+    add_column(conn, "shooters", "wyco_points", "REAL")
+    add_column(conn, "matches", "practiscore_uuid", "TEXT")
+    add_column(conn, "matches", "match_url", "TEXT")
+
+
+# --- Migration 3: achievements table (was create_ach_table.py) ---
+def achievements_table(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS achievements (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            shooter_id INTEGER,
+            match_id INTEGER,
+            achievement TEXT,
+            date_awarded TEXT DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE(shooter_id, match_id, achievement)
+        )
+    """)
+
+
+def has_rows(conn, table):
+    exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone()
+    return exists is not None and conn.execute(f"SELECT 1 FROM {table} LIMIT 1").fetchone() is not None
+
+
+def require_unique(conn, table, column, fix_hint):
+    dupes = conn.execute(f"""
+        SELECT {column}, COUNT(*) FROM {table}
+        WHERE {column} IS NOT NULL
+        GROUP BY {column} HAVING COUNT(*) > 1
+    """).fetchall()
+    if dupes:
+        listing = ", ".join(f"'{value}' x{count}" for value, count in dupes[:5])
+        raise MigrationError(f"{table}.{column} has duplicates ({listing}). {fix_hint}")
+
+
+# --- Migration 4: indexes for the hot lookups in the scraper, points, classification and pages ---
+def hot_lookup_indexes(conn):
+    require_unique(conn, "shooters", "name", "Run fix_duplicates.py first.")
+    require_unique(conn, "matches", "match_name", "Delete the duplicate match rows first.")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_scores_match_stage ON scores(match_id, stage_name, points)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_scores_shooter_stage ON scores(shooter_id, stage_name, match_id, wyco_points)")
+    conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_shooters_name ON shooters(name)")
+    conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_matches_name ON matches(match_name)")
+    conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_matches_uuid ON matches(practiscore_uuid)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_matches_date ON matches(match_date)")
+
+
+# --- Migration 5: classification audit trail and per-shooter evaluation state ---
+def classification_history(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS classification_history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            shooter_id INTEGER,
+            previous_class TEXT,
+            classification TEXT,
+            match_id INTEGER,
+            reason TEXT,
+            changed_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY(shooter_id) REFERENCES shooters(shooter_id),
+            FOREIGN KEY(match_id) REFERENCES matches(match_id)
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_classification_history_shooter ON classification_history(shooter_id)")
+    # scores_counted / recent_scores (JSON, last 3) / last match are what the next import continues from
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS classification_state (
+            shooter_id INTEGER PRIMARY KEY,
+            scores_counted INTEGER,
+            initial_class TEXT,
+            computed_class TEXT,
+            class_match_id INTEGER,
+            class_reason TEXT,
+            recent_scores TEXT,
+            last_match_date TEXT,
+            last_match_id INTEGER,
+            FOREIGN KEY(shooter_id) REFERENCES shooters(shooter_id)
+        )
+    """)
+
+
+# --- Migration 6: materialized leaderboard, rebuilt by standings.refresh() after points/classification ---
+def standings_table(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS standings (
+            rank INTEGER PRIMARY KEY,
+            shooter_id INTEGER UNIQUE,
+            shooter_name TEXT,
+            classification TEXT,
+            wyco_points REAL,
+            top_cheyenne REAL,
+            top_laramie REAL,
+            top_pawnee REAL,
+            top_larkspur REAL,
+            top_rawlins REAL,
+            FOREIGN KEY(shooter_id) REFERENCES shooters(shooter_id)
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_standings_class_rank ON standings(classification, rank)")
+
+
+# --- Migration 7: per-shooter summary (all years = year 0), kept current by shooter_stats.refresh() ---
+def shooter_stats_table(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS shooter_stats (
+            shooter_id INTEGER,
+            year INTEGER,
+            matches INTEGER,
+            avg_percentage REAL,
+            avg_place REAL,
+            best_percentage REAL,
+            best_percentage_match_id INTEGER,
+            best_points REAL,
+            best_points_match_id INTEGER,
+            best_place INTEGER,
+            best_place_match_id INTEGER,
+            best_wyco REAL,
+            best_wyco_match_id INTEGER,
+            PRIMARY KEY (shooter_id, year),
+            FOREIGN KEY(shooter_id) REFERENCES shooters(shooter_id)
+        )
+    """)
+
+
+# --- Migration 8: stages table; scores point at (match_id, stage_no) instead of repeating the stage name ---
+STAGE_NO_FROM_NAME = """
+    CASE
+        WHEN stage_name = 'Overall' THEN 0
+        WHEN stage_name GLOB 'Stage [1-9]*' AND SUBSTR(stage_name, 7) NOT GLOB '*[^0-9]*' THEN CAST(SUBSTR(stage_name, 7) AS INTEGER)
+    END
+"""
+
+
+def stages_table(conn):
+    unknown = conn.execute(f"""
+        SELECT DISTINCT stage_name FROM scores WHERE {STAGE_NO_FROM_NAME} IS NULL
+    """).fetchall()
+    if unknown:
+        listing = ", ".join(repr(name) for (name,) in unknown[:5])
+        raise MigrationError(f"scores.stage_name has names that aren't 'Overall' or 'Stage N' ({listing}). Rename them first.")
+
+    # stage_no 0 is the Overall results, 1..N the stages
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS stages (
+            match_id INTEGER,
+            stage_no INTEGER,
+            name TEXT,
+            is_overall INTEGER,
+            PRIMARY KEY (match_id, stage_no),
+            FOREIGN KEY(match_id) REFERENCES matches(match_id)
+        )
+    """)
+    conn.execute(f"""
+        INSERT INTO stages (match_id, stage_no, name, is_overall)
+        SELECT DISTINCT match_id, {STAGE_NO_FROM_NAME}, stage_name, stage_name = 'Overall'
+        FROM scores
+    """)
+
+    # SQLite can't swap a column in place, so rebuild scores with the same ids
+    conn.execute("""
+        CREATE TABLE scores_new (
+            score_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            match_id INTEGER,
+            shooter_id INTEGER,
+            stage_no INTEGER,
+            place INTEGER,
+            percentage REAL,
+            points REAL,
+            wyco_points REAL,
+            FOREIGN KEY(match_id) REFERENCES matches(match_id),
+            FOREIGN KEY(shooter_id) REFERENCES shooters(shooter_id),
+            FOREIGN KEY(match_id, stage_no) REFERENCES stages(match_id, stage_no)
+        )
+    """)
+    conn.execute(f"""
+        INSERT INTO scores_new (score_id, match_id, shooter_id, stage_no, place, percentage, points, wyco_points)
+        SELECT score_id, match_id, shooter_id, {STAGE_NO_FROM_NAME}, place, percentage, points, wyco_points
+        FROM scores
+    """)
+    conn.execute("DROP TABLE scores")
+    conn.execute("ALTER TABLE scores_new RENAME TO scores")
+    conn.execute("CREATE INDEX idx_scores_match_stage ON scores(match_id, stage_no, points)")
+    conn.execute("CREATE INDEX idx_scores_shooter_stage ON scores(shooter_id, stage_no, match_id, wyco_points)")
+
+
+# --- Migration 9: other spellings of a shooter's name, so imports map them to the right shooter_id ---
+def shooter_aliases_table(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS shooter_aliases (
+            alias TEXT PRIMARY KEY,
+            shooter_id INTEGER,
+            source TEXT,
+            score REAL,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY(shooter_id) REFERENCES shooters(shooter_id)
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_shooter_aliases_shooter ON shooter_aliases(shooter_id)")
+
+
+# --- Migration 10: the rest of each results row (time, hits, penalties, division, class), one row per score ---
+def stage_results_table(conn):
+    # Only scores whose page had more than place/name/points/% get a row. extra is a JSON object of
+    # columns without a field here, header -> cell text
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS stage_results (
+            score_id INTEGER PRIMARY KEY,
+            time REAL,
+            hit_factor REAL,
+            hits INTEGER,
+            a INTEGER,
+            b INTEGER,
+            c INTEGER,
+            d INTEGER,
+            misses INTEGER,
+            no_shoots INTEGER,
+            npm INTEGER,
+            procedurals INTEGER,
+            penalties REAL,
+            division TEXT,
+            class TEXT,
+            power_factor TEXT,
+            extra TEXT,
+            FOREIGN KEY(score_id) REFERENCES scores(score_id)
+        )
+    """)
+    # Merges drop duplicate scores and old matches get deleted; their detail goes with them
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS stage_results_score_deleted AFTER DELETE ON scores
+        BEGIN
+            DELETE FROM stage_results WHERE score_id = OLD.score_id;
+        END
+    """)
+
+
+# Append only. A database's PRAGMA user_version is the number of entries already applied.
+MIGRATIONS = [
+    base_schema,
+    wyco_and_practiscore_columns,
+    achievements_table,
+    hot_lookup_indexes,
+    classification_history,
+    standings_table,
+    shooter_stats_table,
+    stages_table,
+    shooter_aliases_table,
+    stage_results_table,
+]
+
+
+def schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn, target=None):
+    # Everything by default; target stops at that version (fix_duplicates needs the schema before the name index)
+    version = schema_version(conn)
+    for number, migration in enumerate(MIGRATIONS[version:target], start=version + 1):
+        with conn:
+            conn.execute("BEGIN")  # DDL doesn't open a transaction implicitly
+            migration(conn)
+            conn.execute(f"PRAGMA user_version = {number}")
+        print(f"🛠️ Applied migration {number}: {migration.__name__}")
+    return schema_version(conn)
+
+
+if __name__ == "__main__":
+    db_path = sys.argv[1] if len(sys.argv) > 1 else DB_PATH
+    conn = sqlite3.connect(db_path)
+    try:
+        version = migrate(conn)
+        print(f"✅ {db_path} is at schema version {version}.")
+    except MigrationError as e:
+        print(f"❌ Migration failed: {e}")
+        sys.exit(1)
+    finally:
+        conn.close()
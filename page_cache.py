@@ -0,0 +1,101 @@
+import gzip
+import hashlib
+import os
+import sqlite3
+import threading
+from collections import namedtuple
+from datetime import datetime
+from urllib.parse import urlparse, parse_qs
+
+import practiscore_html
+from practiscore_html import match_uuid_from_url
+
+CACHE_DIR = "page_cache"
+DEFAULT_PAGE = "overall-combined"
+
+CachedPage = namedtuple("CachedPage", "match_uuid page sha256 etag last_modified fetched_at html")
+
+
+def cache_key(url):
+    parsed = urlparse(url)
+    page = parse_qs(parsed.query).get("page", [DEFAULT_PAGE])[0]
+    return match_uuid_from_url(url) or parsed.path, page
+
+
+class PageCache:
+    # --- Gzipped page bodies stored by SHA-256, indexed by (match UUID, page) in a small SQLite file ---
+    def __init__(self, cache_dir=CACHE_DIR):
+        self.cache_dir = cache_dir
+        os.makedirs(os.path.join(cache_dir, "blobs"), exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(os.path.join(cache_dir, "index.db"), check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS pages (
+                match_uuid TEXT,
+                page TEXT,
+                sha256 TEXT,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at TEXT,
+                PRIMARY KEY (match_uuid, page)
+            )
+        """)
+        self.conn.commit()
+
+    def blob_path(self, digest):
+        return os.path.join(self.cache_dir, "blobs", digest[:2], f"{digest}.html.gz")
+
+    def get(self, url):
+        match_uuid, page = cache_key(url)
+        with self.lock:
+            row = self.conn.execute("""
+                SELECT sha256, etag, last_modified, fetched_at FROM pages
+                WHERE match_uuid = ? AND page = ?
+            """, (match_uuid, page)).fetchone()
+        if not row:
+            return None
+        path = self.blob_path(row[0])
+        if not os.path.exists(path):
+            return None
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            return CachedPage(match_uuid, page, *row, f.read())
+
+    def put(self, url, html, etag=None, last_modified=None):
+        match_uuid, page = cache_key(url)
+        digest = hashlib.sha256(html.encode("utf-8")).hexdigest()
+        path = self.blob_path(digest)
+
+        # Identical pages share one blob, so only write bodies we haven't seen
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+                f.write(html)
+            os.replace(tmp_path, path)
+
+        with self.lock:
+            self.conn.execute("""
+                INSERT OR REPLACE INTO pages (match_uuid, page, sha256, etag, last_modified, fetched_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, (match_uuid, page, digest, etag, last_modified, datetime.now().isoformat(timespec="seconds")))
+            self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+def conditional_headers(cached):
+    # Lets the server answer 304 Not Modified instead of resending a page we already have
+    headers = {}
+    if cached and cached.etag:
+        headers["If-None-Match"] = cached.etag
+    if cached and cached.last_modified:
+        headers["If-Modified-Since"] = cached.last_modified
+    return headers
+
+
+def read_replay(cache, url):
+    cached = cache.get(url)
+    if cached is None:
+        raise practiscore_html.PageNotFound(url)
+    return cached.html
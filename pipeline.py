@@ -0,0 +1,140 @@
+import argparse
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+
+import achievements
+import classify_shooters
+import migrations
+import page_cache
+import scoring
+import scraperv2
+import shooter_stats
+import standings
+from ingest import BulkIngestor
+from progress import Progress
+
+# One import run, in process: fetch → parse → ingest → points → classify → achievements → standings.
+# The GUI, the command line (this file or scraperv2.py) and anything else that imports matches call run().
+# Every stage commits on its own, so a failure late in the run keeps the matches already ingested, and
+# those still get their points, classes and standings before the error goes on up.
+# Cancelling (progress.cancel()) stops fetching further matches; whatever was already ingested still
+# gets its points, classes and standings so the database never sits half updated.
+DB_PATH = scraperv2.DB_PATH
+URLS_FILE = "match_urls.txt"
+
+STAGES = ["fetch", "parse", "ingest", "points", "classify", "achievements", "standings"]
+
+PipelineRun = namedtuple("PipelineRun", "match_ids timings cancelled")
+
+
+class Timings:
+    # Seconds per stage. fetch is time spent waiting on page batches (fetched concurrently), parse the lxml work after
+    def __init__(self):
+        self.seconds = dict.fromkeys(STAGES, 0.0)
+        self.lock = threading.Lock()
+        self.started = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def add(self, name, seconds):
+        with self.lock:
+            self.seconds[name] += seconds
+
+    def total(self):
+        return time.perf_counter() - self.started
+
+    def report(self):
+        print("\n⏱️ Pipeline timings:")
+        for name in STAGES:
+            print(f"   {name:<13}{self.seconds[name]:8.2f}s")
+        print(f"   {'total':<13}{self.total():8.2f}s")
+
+
+def update_derived(conn, match_ids, timings, progress):
+    # Only the new matches and the shooters who shot them need their points redone
+    with timings.stage("points"):
+        scores_updated, shooters_updated = scoring.recalculate(conn, match_ids)
+    print(f"🎯 WYCO points updated for {scores_updated} score(s) and {shooters_updated} shooter(s).")
+    progress.emit("points", f"WYCO points updated for {scores_updated} score(s) and {shooters_updated} shooter(s)",
+                  scores=scores_updated, shooters=shooters_updated)
+    with timings.stage("classify"):
+        changes = classify_shooters.classify_matches(conn, match_ids)
+    print(f"🔹 Classification changed for {len(changes)} shooter(s).")
+    progress.emit("classify", f"Classification changed for {len(changes)} shooter(s)", shooters=len(changes))
+    with timings.stage("achievements"):
+        earned, stored = achievements.award(conn)
+    print(f"🏅 {stored} new achievement(s) stored.")
+    progress.emit("achievements", f"{stored} new achievement(s)", achievements=stored)
+    # Standings and the per-shooter stats both read the new points
+    with timings.stage("standings"):
+        ranked = standings.refresh(conn)
+        summarized = shooter_stats.refresh_matches(conn, match_ids)
+    print(f"🏆 Standings rebuilt for {ranked} shooter(s).")
+    print(f"📊 Shooter stats rebuilt ({summarized} row(s)).")
+    progress.emit("standings", f"Standings rebuilt for {ranked} shooter(s)", shooters=ranked)
+
+
+def run(match_urls, db_path=DB_PATH, venue_id=None, use_http=True, cache=None, replay=False,
+        pool_size=scraperv2.PAGE_POOL_SIZE, progress=None):
+    # One connection for the whole run; timings are printed at the end whether or not it succeeded
+    progress = progress or Progress()
+    timings = Timings()
+    ingestor = None
+    conn = sqlite3.connect(db_path)
+    try:
+        migrations.migrate(conn)
+        # Created here so the matches it committed are known even if scraping stops with an error
+        ingestor = BulkIngestor(conn)
+        scraperv2.scrape_matches(conn, match_urls, pool_size, use_http, cache, replay, venue_id, timings, progress,
+                                 ingestor)
+    finally:
+        try:
+            # Later runs skip these matches by UUID, so this is the only chance to bring their derived data up
+            if ingestor and ingestor.match_ids:
+                update_derived(conn, ingestor.match_ids, timings, progress)
+        finally:
+            conn.close()
+            timings.report()
+    return PipelineRun(list(ingestor.match_ids), timings, progress.cancelled())
+
+
+def read_urls(path=URLS_FILE):
+    # Lines starting with # are labels/comments
+    with open(path) as f:
+        return [line.strip() for line in f if line.strip() and not line.strip().startswith("#")]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import PractiScore matches and update points, classes and standings")
+    parser.add_argument("urls", nargs="*", help=f"match URLs (default: the ones in {URLS_FILE})")
+    parser.add_argument("--venue", type=int, choices=sorted(scraperv2.VENUE_MAP.values()),
+                        help="venue ID for every match, instead of working it out from the match name")
+    parser.add_argument("--browser-only", action="store_true",
+                        help="skip the HTTP + lxml fast path and load every page in Chromium")
+    parser.add_argument("--replay", action="store_true",
+                        help="re-parse pages from the local page cache only, with no network access")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="don't read or write the local page cache")
+    parser.add_argument("--db", default=DB_PATH, help="database to import into (default: %(default)s)")
+    args = parser.parse_args()
+
+    if args.replay and args.no_cache:
+        parser.error("--replay needs the page cache")
+
+    cache = None if args.no_cache else page_cache.PageCache()
+    run(args.urls or read_urls(), args.db, args.venue, use_http=not args.browser_only, cache=cache, replay=args.replay)
+
+    print("\n🎯 All matches processed!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+import re
+from urllib.parse import urlparse
+
+from lxml import etree, html as lxml_html
+
+HTTP_TIMEOUT = 15
+USER_AGENT = "Mozilla/5.0 (compatible; wyco-practiscore-scraper)"
+
+# --- Compiled once, reused for every page ---
+ROWS_XPATH = etree.XPath("//table//tr")
+CELLS_XPATH = etree.XPath("./th | ./td")
+TITLE_XPATH = etree.XPath("//h3 | //h2")
+TABLE_XPATH = etree.XPath("//table")
+STAGE_LINKS_XPATH = etree.XPath("//a/@href | //option/@value")
+
+UUID_RE = re.compile(r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}")
+STAGE_PAGE_RE = re.compile(r"page=stage(\d+)-combined")
+
+
+class PageNotFound(Exception):
+    pass
+
+
+class StaticParseError(Exception):
+    pass
+
+
+def match_uuid_from_url(url):
+    found = UUID_RE.search(urlparse(url).path)
+    return found.group(0).lower() if found else None
+
+
+def parse_document(html_text):
+    try:
+        return lxml_html.fromstring(html_text)
+    except (etree.ParserError, ValueError) as e:
+        raise StaticParseError(str(e)) from e
+
+
+def cell_text(cell):
+    # Collapse whitespace the way the browser's inner_text() renders a table cell
+    return " ".join(cell.text_content().split())
+
+
+def parse_table(html_text):
+    tree = html_text if isinstance(html_text, lxml_html.HtmlElement) else parse_document(html_text)
+    if not TABLE_XPATH(tree):
+        raise StaticParseError("no results table in page")
+    return [[cell_text(cell) for cell in CELLS_XPATH(row)] for row in ROWS_XPATH(tree)]
+
+
+def parse_title(html_text):
+    tree = html_text if isinstance(html_text, lxml_html.HtmlElement) else parse_document(html_text)
+    # Same preference as the browser path: first <h3>, otherwise first <h2>
+    headings = TITLE_XPATH(tree)
+    for tag in ("h3", "h2"):
+        for heading in headings:
+            if heading.tag == tag:
+                return cell_text(heading)
+    return "Unknown Match"
+
+
+def number(cell):
+    return float(cell.replace(",", "").replace("%", ""))
+
+
+def count(cell):
+    return int(number(cell))
+
+
+# Results columns besides place/name/points/% -> (stage_results column, how to read the cell).
+# PractiScore's headers vary by discipline (PRS: Time/Hits/Penalties, USPSA: A/C/D/M/NS/Proc/HF)
+DETAIL_COLUMNS = {
+    "time": ("time", number),
+    "stage time": ("time", number),
+    "hf": ("hit_factor", number),
+    "hit factor": ("hit_factor", number),
+    "hits": ("hits", count),
+    "impacts": ("hits", count),
+    "a": ("a", count),
+    "b": ("b", count),
+    "c": ("c", count),
+    "d": ("d", count),
+    "m": ("misses", count),
+    "miss": ("misses", count),
+    "misses": ("misses", count),
+    "ns": ("no_shoots", count),
+    "npm": ("npm", count),
+    "proc": ("procedurals", count),
+    "procedurals": ("procedurals", count),
+    "penalties": ("penalties", number),
+    "penalty": ("penalties", number),
+    "division": ("division", str),
+    "div": ("division", str),
+    "class": ("class", str),
+    "pf": ("power_factor", str),
+    "power factor": ("power_factor", str),
+}
+CORE_COLUMNS = {"place", "name", "match pts", "stage pts", "match %", "stage %"}
+
+
+def parse_detail(data, column_map):
+    # Known columns typed into their stage_results field; anything else (or unreadable) kept as text in "extra"
+    detail, extra = {}, {}
+    for header, idx in column_map.items():
+        if header in CORE_COLUMNS or idx >= len(data) or data[idx] in ("", "-"):
+            continue
+        column = DETAIL_COLUMNS.get(header)
+        if column is None:
+            extra[header] = data[idx]
+            continue
+        field, read = column
+        try:
+            detail[field] = read(data[idx])
+        except ValueError:
+            extra[header] = data[idx]
+    if extra:
+        detail["extra"] = extra
+    return detail
+
+
+def stage_indexes(links):
+    # The overall page links (or lists in its dropdown) every stage as ?page=stage<N>-combined.
+    # Returns the N's in order; empty when the page doesn't list them
+    found = (STAGE_PAGE_RE.search(link) for link in links)
+    return sorted({int(m.group(1)) for m in found if m})
+
+
+def parse_shooter_rows(table, column_map):
+    shooter_data = []
+    for data in table:
+        if not column_map and any("match pts" in cell.lower() or "stage pts" in cell.lower() for cell in data):
+            column_map.update({cell.lower(): idx for idx, cell in enumerate(data)})
+            continue
+
+        if len(data) < 4 or not column_map:
+            continue
+
+        try:
+            name = data[column_map.get("name", 1)]
+            place = int(data[column_map.get("place", 0)])
+            points_key = "match pts" if "match pts" in column_map else "stage pts"
+            percentage_key = "match %" if "match %" in column_map else "stage %"
+            points = float(data[column_map[points_key]])
+            percentage = float(data[column_map[percentage_key]].replace('%', '').strip())
+            shooter_data.append((name, place, percentage, points, parse_detail(data, column_map)))
+        except (ValueError, IndexError):
+            continue
+
+    return shooter_data
+
+
+def parse_results_page(html_text):
+    table = parse_table(html_text)
+    if len(table) < 3:
+        return None
+    return parse_shooter_rows(table, {})
+
+
+def parse_overall_page(html_text):
+    tree = parse_document(html_text)
+    return parse_title(tree), parse_results_page(tree) or [], stage_indexes(STAGE_LINKS_XPATH(tree))
@@ -0,0 +1,32 @@
+import threading
+from collections import namedtuple
+
+# kind: "match", "stage", "ingested", "points", "classify", "achievements", "standings", "cancelled", ...
+# message: a line fit for a log window. data: the numbers behind it (e.g. stage / stages)
+ProgressEvent = namedtuple("ProgressEvent", "kind message data")
+
+
+class Cancelled(Exception):
+    pass
+
+
+class Progress:
+    # --- Events out to whoever listens (the GUI reads them off a queue), cancel requests in ---
+    def __init__(self, events=None):
+        self.events = events
+        self.cancel_requested = threading.Event()
+
+    def emit(self, kind, message, **data):
+        if self.events is not None:
+            self.events.put(ProgressEvent(kind, message, data))
+
+    def cancel(self):
+        self.cancel_requested.set()
+
+    def cancelled(self):
+        return self.cancel_requested.is_set()
+
+    def checkpoint(self):
+        # Called between stages; a cancel takes effect here, never half way through a write
+        if self.cancelled():
+            raise Cancelled()
@@ -0,0 +1,144 @@
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+# --- Rounding strategies: take a float array, return the rounded array ---
+def python_round(decimals):
+    # Python's round() per value: what pointsv2 has always stored
+    def apply(values):
+        return np.array([round(v, decimals) for v in values], dtype=float)
+    return apply
+
+
+# rounding: strategy above. exclude_zero_venues: leave 0-point venue bests out of the top 3
+ScoringPolicy = namedtuple("ScoringPolicy", "rounding exclude_zero_venues")
+
+WYCO_POLICY = ScoringPolicy(rounding=python_round(2), exclude_zero_venues=False)
+
+
+def id_list(ids):
+    return ",".join("?" * len(ids))
+
+
+def overall_scores_query(match_ids=None):
+    # Every Overall score of the given matches, plus the full history of anyone who shot them.
+    # (sql, params), so Tools/check_query_plans.py can check the plan of the real query
+    if match_ids is None:
+        scope, params = "", []
+    else:
+        match_ids = list(match_ids)
+        scope = f"""
+            AND (s.match_id IN ({id_list(match_ids)})
+                 OR s.shooter_id IN (SELECT shooter_id FROM scores
+                                     WHERE stage_no = 0 AND match_id IN ({id_list(match_ids)})))
+        """
+        params = match_ids + match_ids
+    return f"""
+        SELECT s.score_id, s.match_id, s.shooter_id, s.points, s.wyco_points, m.venue_id
+        FROM scores s
+        JOIN matches m ON s.match_id = m.match_id
+        WHERE s.stage_no = 0 {scope}
+    """, params
+
+
+def load_overall_scores(conn, match_ids=None):
+    sql, params = overall_scores_query(match_ids)
+    return pd.read_sql_query(sql, conn, params=params)
+
+
+def match_points(scores, policy=WYCO_POLICY):
+    # points / match top score * 100. NaN where the match has no usable top score (left untouched)
+    points = scores["points"].astype(float)
+    top = points.groupby(scores["match_id"]).transform("max")
+    usable = top.notna() & (top != 0)
+
+    wyco = pd.Series(np.nan, index=scores.index)
+    scored = usable & points.notna() & (points != 0)
+    wyco[usable] = 0.0
+    wyco[scored] = policy.rounding((points[scored] / top[scored] * 100).to_numpy())
+    return wyco
+
+
+def shooter_totals(scores, shooter_ids, policy=WYCO_POLICY):
+    # Sum of the best score at each of a shooter's top 3 venues, added best-first like the old loop
+    venue_best = (
+        scores[scores["venue_id"].notna() & scores["wyco_points"].notna()]
+        .groupby(["shooter_id", "venue_id"])["wyco_points"].max()
+        .reset_index()
+    )
+    if policy.exclude_zero_venues:
+        venue_best = venue_best[venue_best["wyco_points"] > 0]
+
+    venue_best = venue_best.sort_values(["shooter_id", "wyco_points"], ascending=[True, False])
+    venue_best["venue_rank"] = venue_best.groupby("shooter_id").cumcount()
+    top_3 = (
+        venue_best[venue_best["venue_rank"] < 3]
+        .pivot(index="shooter_id", columns="venue_rank", values="wyco_points")
+        .reindex(index=shooter_ids, columns=range(3))
+        .fillna(0.0)
+    )
+    total = (top_3[0] + top_3[1]) + top_3[2]
+    return pd.Series(policy.rounding(total.to_numpy()), index=total.index)
+
+
+def changed(new, old):
+    # Exact comparison on purpose: only rows whose stored value would actually change get written
+    return new.notna() & ~((old == new) & old.notna())
+
+
+def load_member_totals(conn, shooter_ids=None):
+    # Stored totals of active members, all of them or just these
+    shooter_filter, params = "", []
+    if shooter_ids is not None:
+        shooter_ids = [int(i) for i in shooter_ids]
+        shooter_filter, params = f"AND shooter_id IN ({id_list(shooter_ids)})", shooter_ids
+    return pd.read_sql_query(f"""
+        SELECT shooter_id, wyco_points FROM shooters
+        WHERE wyco_number IS NOT NULL AND membership_active = 1 {shooter_filter}
+    """, conn, params=params).set_index("shooter_id")["wyco_points"]
+
+
+def recalculate(conn, match_ids=None, policy=WYCO_POLICY):
+    match_ids = None if match_ids is None else list(match_ids)
+    scores = load_overall_scores(conn, match_ids)
+
+    # --- Step 1: match-level WYCO points ---
+    in_scope = scores["match_id"].isin(match_ids) if match_ids is not None else pd.Series(True, index=scores.index)
+    new_points = match_points(scores[in_scope], policy)
+    write_scores = changed(new_points, scores.loc[in_scope, "wyco_points"])
+    scores.loc[new_points.index[new_points.notna()], "wyco_points"] = new_points.dropna()
+
+    # --- Step 2: totals for active members (everyone who shot the matches, when incremental) ---
+    affected = None if match_ids is None else scores.loc[in_scope, "shooter_id"].unique().tolist()
+    members = load_member_totals(conn, affected)
+    totals = shooter_totals(scores, members.index, policy)
+    write_totals = changed(totals, members)
+
+    score_index = write_scores.index[write_scores]
+    score_rows = list(zip(new_points[score_index].tolist(), scores.loc[score_index, "score_id"].tolist()))
+    total_rows = list(zip(totals[write_totals].tolist(), totals.index[write_totals].tolist()))
+    with conn:
+        conn.executemany("UPDATE scores SET wyco_points = ? WHERE score_id = ?", score_rows)
+        conn.executemany("UPDATE shooters SET wyco_points = ? WHERE shooter_id = ?", total_rows)
+    return len(score_rows), len(total_rows)
+
+
+def recalculate_totals(conn, shooter_ids, policy=WYCO_POLICY):
+    # Totals only, from the match points already stored: for shooters whose membership changed
+    shooter_ids = [int(i) for i in shooter_ids]
+    if not shooter_ids:
+        return 0
+    scores = pd.read_sql_query(f"""
+        SELECT s.score_id, s.match_id, s.shooter_id, s.points, s.wyco_points, m.venue_id
+        FROM scores s
+        JOIN matches m ON s.match_id = m.match_id
+        WHERE s.stage_no = 0 AND s.shooter_id IN ({id_list(shooter_ids)})
+    """, conn, params=shooter_ids)
+    members = load_member_totals(conn, shooter_ids)
+    totals = shooter_totals(scores, members.index, policy)
+    write_totals = changed(totals, members)
+    total_rows = list(zip(totals[write_totals].tolist(), totals.index[write_totals].tolist()))
+    with conn:
+        conn.executemany("UPDATE shooters SET wyco_points = ? WHERE shooter_id = ?", total_rows)
+    return len(total_rows)
@@ -1,8 +1,31 @@
-import sqlite3
 import re
 import time
+from contextlib import nullcontext
 from datetime import datetime
-from playwright.sync_api import sync_playwright, TimeoutError
+from playwright.sync_api import sync_playwright, TimeoutError, Error as PlaywrightError
+
+import async_fetch
+import page_cache
+from progress import Cancelled, Progress
+from ingest import BulkIngestor
+import practiscore_html
+from practiscore_html import parse_shooter_rows
+
+DB_PATH = "allshooters_prs.db"
+HEADLESS = True
+PAGE_POOL_SIZE = 4
+PAGE_TIMEOUT_MS = 15000
+RESULTS_SELECTOR = "table tr td"
+RESULTS_ROWS_SELECTOR = "table tr"
+STAGE_LINKS_SELECTOR = "a[href], option[value]"
+
+TABLE_SCRIPT = """
+rows => rows.map(row => Array.from(row.querySelectorAll("th, td"), cell => cell.innerText.trim()))
+"""
+
+LINKS_SCRIPT = """
+els => els.map(el => el.getAttribute("href") || el.getAttribute("value") || "")
+"""
 
 VENUE_MAP = {
     'cheyenne': 1,
@@ -12,188 +35,336 @@ VENUE_MAP = {
     'rawlins': 5,
 }
 
-def init_db():
-    conn = sqlite3.connect("allshooters_prs.db")
-    c = conn.cursor()
-    c.execute("""
-        CREATE TABLE IF NOT EXISTS matches (
-            match_id INTEGER PRIMARY KEY AUTOINCREMENT,
-            match_name TEXT,
-            match_date TEXT,
-            venue_id INTEGER
-        )
-    """)
-    c.execute("""
-        CREATE TABLE IF NOT EXISTS shooters (
-            shooter_id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT,
-            wyco_number TEXT,
-            wyco_points REAL,
-            classification TEXT,
-            membership_active INTEGER
-        )
-    """)
-    c.execute("""
-        CREATE TABLE IF NOT EXISTS scores (
-            score_id INTEGER PRIMARY KEY AUTOINCREMENT,
-            match_id INTEGER,
-            shooter_id INTEGER,
-            stage_name TEXT,
-            place INTEGER,
-            percentage REAL,
-            points REAL,
-            FOREIGN KEY(match_id) REFERENCES matches(match_id),
-            FOREIGN KEY(shooter_id) REFERENCES shooters(shooter_id)
-        )
-    """)
-    conn.commit()
-    conn.close()
-
+# Per-cell extraction, one Playwright round-trip per <td>. Kept for Tools/bench_extraction.py
 def extract_shooter_data(rows, column_map):
-    shooter_data = []
-    for row in rows:
-        cells = row.query_selector_all("th, td")
-        data = [cell.inner_text().strip() for cell in cells]
+    table = [[cell.inner_text().strip() for cell in row.query_selector_all("th, td")] for row in rows]
+    return parse_shooter_rows(table, column_map)
 
-        if not column_map and any("match pts" in cell.lower() or "stage pts" in cell.lower() for cell in data):
-            column_map.update({cell.lower(): idx for idx, cell in enumerate(data)})
-            continue
+def read_match_title(page):
+    match_title = page.query_selector("h3") or page.query_selector("h2")
+    return match_title.inner_text().strip() if match_title else "Unknown Match"
 
-        if len(data) < 4 or not column_map:
-            continue
+def read_table(page):
+    # One round-trip: the whole table comes back as a 2D array of cell text, header row included
+    return page.eval_on_selector_all(RESULTS_ROWS_SELECTOR, TABLE_SCRIPT)
+
+def read_results_page(page):
+    table = read_table(page)
+    if not table or len(table) < 3:
+        return None
+    return parse_shooter_rows(table, {})
+
+def read_overall_page(page):
+    links = page.eval_on_selector_all(STAGE_LINKS_SELECTOR, LINKS_SCRIPT)
+    return read_match_title(page), read_results_page(page) or [], practiscore_html.stage_indexes(links)
+
+# Marks a page the static parser couldn't read, so the browser gets a turn at it
+NEEDS_BROWSER = object()
+# Marks a page that couldn't be loaded at all, as opposed to None: the page doesn't exist
+FETCH_FAILED = object()
+
+class StageFetchFailed(Exception):
+    pass
+
+class PagePool:
+    # --- One browser context with a fixed set of tabs reused for every page load ---
+    def __init__(self, context, size=PAGE_POOL_SIZE):
+        self.pages = [context.new_page() for _ in range(size)]
 
+    def fetch(self, urls, extract):
+        results = []
+        size = len(self.pages)
+        for start in range(0, len(urls), size):
+            batch = list(zip(self.pages, urls[start:start + size]))
+
+            # Start every navigation first so the browser loads the whole batch in parallel
+            started = []
+            for page, url in batch:
+                try:
+                    page.goto(url, wait_until="commit", timeout=PAGE_TIMEOUT_MS)
+                    started.append(True)
+                except PlaywrightError as e:
+                    print(f"❌ Error loading {url}: {e}")
+                    started.append(False)
+
+            # Then wait on the results table, sharing one deadline across the batch
+            deadline = time.monotonic() + PAGE_TIMEOUT_MS / 1000
+            for (page, url), ok in zip(batch, started):
+                if not ok:
+                    results.append(FETCH_FAILED)
+                    continue
+                remaining_ms = max(1, (deadline - time.monotonic()) * 1000)
+                try:
+                    page.wait_for_selector(RESULTS_SELECTOR, timeout=remaining_ms)
+                    results.append(extract(page))
+                except TimeoutError:
+                    print(f"⏱️ Timeout waiting for results on {url}")
+                    results.append(None)
+        return results
+
+class PageFetcher:
+    # --- Async HTTP + lxml first, Playwright only for pages the static path can't load or read ---
+    def __init__(self, playwright, pool_size=PAGE_POOL_SIZE, use_http=True, cache=None, replay=False, timings=None):
+        self.playwright = playwright
+        self.timings = timings
+        self.pool_size = pool_size
+        self.http = async_fetch.AsyncFetcher(pool_size, cache=cache) if use_http and not replay else None
+        self.cache = cache
+        self.replay = replay
+        self.browser = None
+        self.pool = None
+
+    def timed(self, stage):
+        return self.timings.stage(stage) if self.timings else nullcontext()
+
+    def browser_pool(self):
+        if self.pool is None:
+            self.browser = self.playwright.chromium.launch(headless=HEADLESS)
+            self.pool = PagePool(self.browser.new_context(), self.pool_size)
+        return self.pool
+
+    def parse_static(self, html, parse_html):
         try:
-            name = data[column_map.get("name", 1)]
-            place = int(data[column_map.get("place", 0)])
-            points_key = "match pts" if "match pts" in column_map else "stage pts"
-            percentage_key = "match %" if "match %" in column_map else "stage %"
-            points = float(data[column_map[points_key]])
-            percentage = float(data[column_map[percentage_key]].replace('%', '').strip())
-            shooter_data.append((name, place, percentage, points))
-        except (ValueError, IndexError):
-            continue
+            with self.timed("parse"):
+                return parse_html(html)
+        except practiscore_html.StaticParseError as e:
+            print(f"↪️ Static parse failed, falling back to browser: {e}")
+            return NEEDS_BROWSER
 
-    return shooter_data
+    def fetch_replay(self, url, parse_html, uncached):
+        try:
+            html = page_cache.read_replay(self.cache, url)
+        except practiscore_html.PageNotFound:
+            return uncached
+        return self.parse_static(html, parse_html)
 
-def insert_shooter_and_score(conn, match_id, shooter_data, stage_name):
-    cur = conn.cursor()
+    def fetch_http(self, urls, parse_html):
+        # Returns the parsed pages plus the indexes whose download failed even after retries
+        with self.timed("fetch"):
+            pages = self.http.fetch_many(urls)
+        results, failed = [], set()
+        for i, page in enumerate(pages):
+            if page.status == "missing":
+                results.append(None)
+            elif page.status == "failed":
+                print(f"↪️ {page.url} failed after {page.attempts} attempt(s) ({page.error}), trying the browser")
+                failed.add(i)
+                results.append(NEEDS_BROWSER)
+            else:
+                results.append(self.parse_static(page.html, parse_html))
+        return results, failed
 
-    # ✅ Skip stage if already present
-    cur.execute("SELECT 1 FROM scores WHERE match_id = ? AND stage_name = ?", (match_id, stage_name))
-    if cur.fetchone():
-        print(f"⏩ Stage '{stage_name}' already exists. Skipping.")
-        return
+    def read_and_cache(self, read_page):
+        def read(page):
+            # Keep the rendered DOM so --replay can parse it statically later
+            self.cache.put(page.url, page.content())
+            return read_page(page)
+        return read if self.cache else read_page
 
-    for name, place, percentage, points in shooter_data:
-        cur.execute("SELECT shooter_id FROM shooters WHERE name = ?", (name,))
-        result = cur.fetchone()
-        if result:
-            shooter_id = result[0]
+    def fetch(self, urls, parse_html, read_page, uncached=None):
+        # uncached: the result for a page --replay can't find in the cache. None reads as "no such page",
+        # which is right when probing but not for a page the match says exists
+        failed = set()
+        if self.replay:
+            results = [self.fetch_replay(url, parse_html, uncached) for url in urls]
+        elif self.http:
+            results, failed = self.fetch_http(urls, parse_html)
         else:
-            cur.execute("INSERT INTO shooters (name, wyco_number, wyco_points, classification, membership_active) VALUES (?, '', 0, '', 0)", (name,))
-            shooter_id = cur.lastrowid
+            results = [NEEDS_BROWSER] * len(urls)
 
-        cur.execute("""
-            INSERT INTO scores (match_id, shooter_id, stage_name, place, percentage, points)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (match_id, shooter_id, stage_name, place, percentage, points))
-    conn.commit()
+        fallback = [i for i, result in enumerate(results) if result is NEEDS_BROWSER]
+        if fallback and self.replay:
+            print(f"⚠️ {len(fallback)} cached page(s) couldn't be parsed and --replay never opens the browser.")
+            for i in fallback:
+                results[i] = None
+        elif fallback:
+            # Loading and reading the rendered table happen together in the browser, so it all counts as fetch
+            with self.timed("fetch"):
+                try:
+                    browser_results = self.browser_pool().fetch([urls[i] for i in fallback], self.read_and_cache(read_page))
+                except PlaywrightError as e:
+                    print(f"❌ Browser unavailable: {e}")
+                    browser_results = [FETCH_FAILED] * len(fallback)
+            for i, result in zip(fallback, browser_results):
+                # No results table in the browser either: fine for a page that parsed as empty, but a page
+                # whose download kept failing is still a failure, not a sign the match has no more stages
+                results[i] = FETCH_FAILED if result is None and i in failed else result
+        return results
 
-def scrape_match(overall_url, base_stage_url):
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=False)
-        page = browser.new_page()
+    def close(self):
+        if self.http:
+            self.http.close()
+        if self.cache:
+            self.cache.close()
+        if self.browser:
+            self.browser.close()
 
-        page.goto(overall_url)
-        time.sleep(2)
+def stage_url_for(base_stage_url, stage_index):
+    return f"{base_stage_url}=stage{stage_index}-combined"
 
-        match_title = page.query_selector("h3") or page.query_selector("h2")
-        match_name = match_title.inner_text().strip() if match_title else "Unknown Match"
-        date_match = re.search(r"\d{4}-\d{2}-\d{2}", match_name)
-        match_date = date_match.group(0) if date_match else datetime.now().strftime("%Y-%m-%d")
-        venue_id = None
+def fetch_listed_stages(fetcher, base_stage_url, match_name, stage_indexes, progress):
+    # The overall page said which stages exist, so they're all requested at once and nothing waits on a 404
+    progress.checkpoint()
+    total = len(stage_indexes)
+    print(f"🔍 Fetching {total} stage(s) listed on the results page")
+    stage_urls = [stage_url_for(base_stage_url, i) for i in stage_indexes]
+    stage_pages = fetcher.fetch(stage_urls, practiscore_html.parse_results_page, read_results_page,
+                                uncached=FETCH_FAILED)
+
+    stages = []
+    for number, (i, stage_data) in enumerate(zip(stage_indexes, stage_pages), start=1):
+        stage_name = f"Stage {i + 1}"
+        if stage_data is FETCH_FAILED:
+            # Importing the other stages would leave the match silently short
+            raise StageFetchFailed(f"{stage_name} of '{match_name}' couldn't be loaded")
+        if stage_data is None:
+            print(f"⚠️ No data rows on {stage_name}. Skipping it.")
+            continue
+        stages.append((i + 1, stage_name, stage_data))
+        print(f"✅ {stage_name} scraped.")
+        progress.emit("stage", f"{match_name}: {stage_name} scraped ({number} of {total})", stage=number, stages=total)
+    return stages
+
+def probe_stages(fetcher, base_stage_url, match_name, progress):
+    # For overall pages that don't link their stages: a pool-sized batch at a time until one comes back empty
+    stages = []
+    stage_index = 0
+    while True:
+        progress.checkpoint()
+        batch = list(range(stage_index, stage_index + fetcher.pool_size))
+        print(f"🔍 Trying Stages {batch[0] + 1}-{batch[-1] + 1}")
+        stage_urls = [stage_url_for(base_stage_url, i) for i in batch]
+        stage_pages = fetcher.fetch(stage_urls, practiscore_html.parse_results_page, read_results_page)
+
+        for i, stage_data in zip(batch, stage_pages):
+            stage_name = f"Stage {i + 1}"
+            if stage_data is FETCH_FAILED:
+                # Importing the stages before it would leave the match silently short
+                raise StageFetchFailed(f"{stage_name} of '{match_name}' couldn't be loaded")
+            if stage_data is None:
+                print(f"⚠️ No data rows on {stage_name}. Ending stage scraping.")
+                return stages
+            stages.append((i + 1, stage_name, stage_data))
+            print(f"✅ {stage_name} scraped.")
+            progress.emit("stage", f"{match_name}: {stage_name} scraped", stage=i + 1, stages=None)
+
+        stage_index += len(batch)
+
+def scrape_match(fetcher, ingestor, overall_url, overall, venue_id=None, progress=None):
+    progress = progress or Progress()
+    base_stage_url = overall_url.split("?")[0] + "?page"
+    if overall is None or overall is FETCH_FAILED:
+        print(f"❌ Could not load overall results for {overall_url}. Skipping.")
+        return
+
+    match_name, overall_data, stage_indexes = overall
+    date_match = re.search(r"\d{4}-\d{2}-\d{2}", match_name)
+    match_date = date_match.group(0) if date_match else datetime.now().strftime("%Y-%m-%d")
+    # A venue given by the caller (the GUI asks for one) wins over the match name
+    if not venue_id:
         for venue, vid in VENUE_MAP.items():
             if venue in match_name.lower():
                 venue_id = vid
                 break
-        if not venue_id:
-            venue_id = int(input(f"Couldn't determine venue from '{match_name}'. Enter venue ID manually: 1. Cheyenne 2. Laramie 3. Pawnee 4. Larkspur 5. Rawlins "))
-
-        print(f"📋 Match: {match_name} | Date: {match_date} | Venue ID: {venue_id}")
-
-        conn = sqlite3.connect("allshooters_prs.db")
-        cur = conn.cursor()
-
-        # ✅ Check for existing match
-        cur.execute("SELECT match_id FROM matches WHERE match_name = ?", (match_name,))
-        existing_match = cur.fetchone()
-        if existing_match:
-            print(f"⏩ Match already exists. Skipping match '{match_name}'.")
-            conn.close()
-            browser.close()
-            return
-
-        cur.execute("INSERT INTO matches (match_name, match_date, venue_id) VALUES (?, ?, ?)",
-                    (match_name, match_date, venue_id))
-        match_id = cur.lastrowid
-
-        rows = page.query_selector_all("table tr")
-        overall_column_map = {}
-        overall_data = extract_shooter_data(rows, overall_column_map)
-        insert_shooter_and_score(conn, match_id, overall_data, "Overall")
-
-        browser.close()
-
-        # === Loop through stages
-        stage_index = 0
-        while True:
-            stage_url = f"{base_stage_url}=stage{stage_index}-combined"
-            stage_name = f"Stage {stage_index + 1}"
-            print(f"🔍 Trying {stage_name} @ {stage_url}")
-
-            try:
-                browser = p.chromium.launch(headless=False)
-                page = browser.new_page()
-                page.goto(stage_url)
-                time.sleep(2)
-
-                rows = page.query_selector_all("table tr")
-                if not rows or len(rows) < 3:
-                    print(f"⚠️ No data rows on {stage_name}. Ending stage scraping.")
-                    browser.close()
-                    break
+    if not venue_id:
+        venue_id = int(input(f"Couldn't determine venue from '{match_name}'. Enter venue ID manually: 1. Cheyenne 2. Laramie 3. Pawnee 4. Larkspur 5. Rawlins "))
 
-                stage_column_map = {}
-                stage_data = extract_shooter_data(rows, stage_column_map)
-                insert_shooter_and_score(conn, match_id, stage_data, stage_name)
+    print(f"📋 Match: {match_name} | Date: {match_date} | Venue ID: {venue_id}")
 
-                print(f"✅ {stage_name} scraped.")
-                browser.close()
-                stage_index += 1
+    conn = ingestor.conn
+    cur = conn.cursor()
 
-            except TimeoutError:
-                print(f"⏱️ Timeout on {stage_name}. Ending stage scraping.")
-                browser.close()
-                break
-            except Exception as e:
-                print(f"❌ Error scraping {stage_name}: {e}")
-                browser.close()
-                break
+    match_uuid = practiscore_html.match_uuid_from_url(overall_url)
 
-        conn.close()
+    # ✅ Check for existing match (imported before UUIDs were recorded)
+    cur.execute("SELECT match_id FROM matches WHERE match_name = ?", (match_name,))
+    existing_match = cur.fetchone()
+    if existing_match:
+        # Remember the UUID so the next run skips this match before fetching anything
+        cur.execute("""
+            UPDATE matches SET practiscore_uuid = ?, match_url = ?
+            WHERE match_id = ? AND practiscore_uuid IS NULL
+        """, (match_uuid, overall_url, existing_match[0]))
+        conn.commit()
+        print(f"⏩ Match already exists. Skipping match '{match_name}'.")
+        return
 
-if __name__ == "__main__":
-    init_db()
+    stages = [(0, "Overall", overall_data)]
+    if stage_indexes:
+        stages += fetch_listed_stages(fetcher, base_stage_url, match_name, stage_indexes, progress)
+    else:
+        stages += probe_stages(fetcher, base_stage_url, match_name, progress)
 
-    with open("match_urls.txt") as f:
-        match_urls = [
-            line.strip() for line in f
-            if line.strip() and not line.strip().startswith("#")
-        ]
+    # Match row, new shooters and every score row land in a single transaction
+    progress.checkpoint()
+    rows_before = ingestor.rows_written
+    ingestor.ingest_match(match_name, match_date, venue_id, match_uuid, overall_url, stages)
+    rows = ingestor.rows_written - rows_before
+    progress.emit("ingested", f"{match_name}: {rows} score rows, {ingestor.pending_shooters} new shooter(s)",
+                  rows=rows, shooters=ingestor.pending_shooters)
 
-    for overall_url in match_urls:
-        print(f"\n📦 Processing match: {overall_url}")
-        base_stage_url = overall_url.split("?")[0] + "?page"
-        scrape_match(overall_url, base_stage_url)
+def filter_known_matches(conn, match_urls):
+    known = {row[0] for row in conn.execute(
+        "SELECT practiscore_uuid FROM matches WHERE practiscore_uuid IS NOT NULL"
+    )}
+    new_urls = []
+    for url in match_urls:
+        match_uuid = practiscore_html.match_uuid_from_url(url)
+        if match_uuid in known:
+            continue
+        if match_uuid:
+            known.add(match_uuid)  # also drops repeats within the URL list
+        new_urls.append(url)
+    return new_urls
+
+def scrape_matches(conn, match_urls, pool_size=PAGE_POOL_SIZE, use_http=True, cache=None, replay=False,
+                   venue_id=None, timings=None, progress=None, ingestor=None):
+    # Fetch, parse and ingest; returns the new match_ids. Points and the rest are pipeline.py's job.
+    # A cancel stops before the next match or stage batch; matches already ingested stay.
+    # Pass an ingestor to still know which matches were committed if this raises part way through
+    progress = progress or Progress()
+    ingestor = ingestor or BulkIngestor(conn)
+    new_urls = filter_known_matches(conn, match_urls)
+    skipped = len(match_urls) - len(new_urls)
+    if skipped:
+        print(f"⏩ Skipping {skipped} already-imported match URL(s) without fetching them.")
+    if not new_urls:
+        print("✅ Nothing new to scrape.")
+        if cache:
+            cache.close()
+        return []
+    match_urls = new_urls
 
-    print("\n🎯 All matches processed!")
+    with sync_playwright() as p:
+        fetcher = PageFetcher(p, pool_size, use_http, cache, replay, timings)
+        try:
+            # Overall pages for several matches load side by side, stages follow per match
+            progress.emit("fetch", f"Loading {len(match_urls)} overall results page(s)", matches=len(match_urls))
+            overall_pages = fetcher.fetch(match_urls, practiscore_html.parse_overall_page, read_overall_page)
+            for number, (overall_url, overall) in enumerate(zip(match_urls, overall_pages), start=1):
+                print(f"\n📦 Processing match: {overall_url}")
+                progress.emit("match", f"Match {number} of {len(match_urls)}: {overall_url}",
+                              match=number, matches=len(match_urls))
+                try:
+                    progress.checkpoint()
+                    scrape_match(fetcher, ingestor, overall_url, overall, venue_id, progress)
+                except StageFetchFailed as e:
+                    print(f"❌ {e}. Match not imported; the next run tries it again.")
+                    progress.emit("failed", f"{e}, match not imported", match=number, matches=len(match_urls))
+                except Cancelled:
+                    print("🛑 Cancelled.")
+                    progress.emit("cancelled", f"Cancelled before match {number} of {len(match_urls)} was ingested",
+                                  match=number, matches=len(match_urls))
+                    break
+        finally:
+            fetcher.close()
+
+    ingestor.report()
+    if timings:
+        timings.add("ingest", ingestor.seconds)
+    return ingestor.match_ids
+
+if __name__ == "__main__":
+    # Kept so "python scraperv2.py" still does a full import; the options live in pipeline.py
+    import pipeline
+    pipeline.main()
@@ -0,0 +1,141 @@
+import pandas as pd
+
+import migrations
+
+ALL_YEARS = 0  # year value of the row covering a shooter's whole history
+
+# Summary column -> (results column it comes from, whether the best is the max)
+BESTS = {
+    "best_percentage": ("percentage", True),
+    "best_points": ("points", True),
+    "best_place": ("place", False),
+    "best_wyco": ("wyco_points", True),
+}
+
+STATS_COLUMNS = ["shooter_id", "year", "matches", "avg_percentage", "avg_place"] + [
+    column for best in BESTS for column in (best, f"{best}_match_id")
+]
+
+
+def id_filter(column, ids):
+    if ids is None:
+        return "", []
+    ids = [int(i) for i in ids]
+    return f"AND {column} IN ({','.join('?' * len(ids))})", ids
+
+
+def results_query(shooter_ids=None):
+    # (sql, params) for load_results, also what Tools/check_query_plans.py checks
+    shooter_filter, params = id_filter("sc.shooter_id", shooter_ids)
+    return f"""
+        SELECT sc.shooter_id, sc.match_id, m.match_name, sc.place, sc.points, sc.percentage, sc.wyco_points, m.match_date
+        FROM scores sc
+        JOIN matches m ON sc.match_id = m.match_id
+        WHERE sc.stage_no = 0 AND sc.percentage > 0 AND sc.points > 0
+        {shooter_filter}
+    """, params
+
+
+def load_results(conn, shooter_ids=None, year=None):
+    # Non-zero Overall results with a usable date, oldest first: what the stats page charts
+    sql, params = results_query(shooter_ids)
+    results = pd.read_sql_query(sql, conn, params=params)
+    results["match_date"] = pd.to_datetime(results["match_date"], errors="coerce")
+    results = results.dropna(subset=["match_date"])
+    if year is not None and year != ALL_YEARS:
+        results = results[results["match_date"].dt.year == year]
+    return results.sort_values(["shooter_id", "match_date", "match_id"], kind="stable").reset_index(drop=True)
+
+
+def compute_stats(results):
+    # One row per shooter per year, plus a year = ALL_YEARS row per shooter
+    both = pd.concat([
+        results.assign(year=results["match_date"].dt.year),
+        results.assign(year=ALL_YEARS),
+    ], ignore_index=True)
+    groups = both.groupby(["shooter_id", "year"], sort=True)
+
+    stats = pd.DataFrame({
+        "matches": groups.size(),
+        "avg_percentage": groups["percentage"].mean(),
+        "avg_place": groups["place"].mean(),
+    })
+    for best, (column, highest) in BESTS.items():
+        # idxmax/idxmin keep the earliest match on ties, like the page always showed
+        scored = both.dropna(subset=[column]).groupby(["shooter_id", "year"])[column]
+        at = scored.idxmax() if highest else scored.idxmin()
+        stats[best] = both.loc[at, column].set_axis(at.index)
+        stats[f"{best}_match_id"] = both.loc[at, "match_id"].set_axis(at.index)
+    return stats.reset_index()[STATS_COLUMNS]
+
+
+def refresh(conn, shooter_ids=None):
+    # Whole table when shooter_ids is None, otherwise only those shooters' rows. An empty table (the migration
+    # only creates it) gets filled for everyone, so the first import doesn't leave every other shooter out
+    if shooter_ids is not None and not migrations.has_rows(conn, "shooter_stats"):
+        shooter_ids = None
+    shooter_ids = None if shooter_ids is None else [int(i) for i in shooter_ids]
+    stats = compute_stats(load_results(conn, shooter_ids))
+    rows = [
+        tuple(None if pd.isna(v) else v.item() if hasattr(v, "item") else v for v in row)
+        for row in stats.itertuples(index=False)
+    ]
+    shooter_filter, params = id_filter("shooter_id", shooter_ids)
+    with conn:
+        conn.execute(f"DELETE FROM shooter_stats WHERE 1 = 1 {shooter_filter}", params)
+        conn.executemany(f"""
+            INSERT INTO shooter_stats ({', '.join(STATS_COLUMNS)})
+            VALUES ({', '.join('?' * len(STATS_COLUMNS))})
+        """, rows)
+    return len(rows)
+
+
+def refresh_matches(conn, match_ids):
+    # Just the shooters who shot these matches
+    match_filter, params = id_filter("match_id", match_ids)
+    shooter_ids = [row[0] for row in conn.execute(
+        f"SELECT DISTINCT shooter_id FROM scores WHERE stage_no = 0 {match_filter}", params
+    )]
+    return refresh(conn, shooter_ids)
+
+
+def stored(conn, shooter_id):
+    # Whether the table has this shooter at all (any year)
+    return migrations.has_rows(conn, "shooter_stats") and conn.execute(
+        "SELECT 1 FROM shooter_stats WHERE shooter_id = ? LIMIT 1", (int(shooter_id),)
+    ).fetchone() is not None
+
+
+SUMMARY_QUERY = f"""
+    SELECT {', '.join(STATS_COLUMNS)} FROM shooter_stats
+    WHERE shooter_id = ? AND year = ?
+"""
+
+
+def load(conn, shooter_id, year=ALL_YEARS):
+    # The summary row with match names filled in; None if the shooter has no results that year
+    if not stored(conn, shooter_id):
+        # Not refreshed for this shooter yet: work it out from their results instead
+        stats = compute_stats(load_results(conn, [shooter_id]))
+        stats = stats[stats["year"] == year]
+    else:
+        stats = pd.read_sql_query(SUMMARY_QUERY, conn, params=(int(shooter_id), int(year)))
+    if stats.empty:
+        return None
+    stats = stats.iloc[0].copy()
+    match_ids = [int(stats[f"{best}_match_id"]) for best in BESTS if pd.notna(stats[f"{best}_match_id"])]
+    names = dict(conn.execute(
+        f"SELECT match_id, match_name FROM matches WHERE match_id IN ({','.join('?' * len(match_ids))})", match_ids
+    ).fetchall())
+    for best in BESTS:
+        stats[f"{best}_match"] = names.get(stats[f"{best}_match_id"])
+    return stats
+
+
+def years(conn, shooter_id):
+    if not stored(conn, shooter_id):
+        dates = load_results(conn, [shooter_id])["match_date"]
+        return sorted(dates.dt.year.unique().tolist())
+    return [year for (year,) in conn.execute(
+        "SELECT year FROM shooter_stats WHERE shooter_id = ? AND year != ? ORDER BY year", (int(shooter_id), ALL_YEARS)
+    )]
@@ -0,0 +1,101 @@
+import argparse
+import json
+import os
+import sqlite3
+
+import pandas as pd
+
+import migrations
+
+try:
+    import pyarrow  # only needed for the Parquet export
+except ImportError:
+    pyarrow = None
+
+DB_PATH = "allshooters_prs.db"
+EXPORT_DIR = "exports"
+
+# stage_results columns after score_id, in table order (see migrations.stage_results_table)
+FIELDS = ["time", "hit_factor", "hits", "a", "b", "c", "d", "misses", "no_shoots", "npm", "procedurals",
+          "penalties", "division", "class", "power_factor", "extra"]
+COUNT_FIELDS = ["hits", "a", "b", "c", "d", "misses", "no_shoots", "npm", "procedurals"]
+TEXT_FIELDS = ["division", "class", "power_factor"]
+
+
+def detail_row(score_id, detail):
+    # detail as practiscore_html.parse_detail returns it
+    extra = detail.get("extra")
+    return (score_id, *(detail.get(field) for field in FIELDS[:-1]), json.dumps(extra) if extra else None)
+
+
+def load(conn, season=None):
+    # One row per stage result (Overall rows left out) in small dtypes, so analytics are plain column scans
+    season_filter = "AND strftime('%Y', m.match_date) = ?" if season else ""
+    frame = pd.read_sql_query(f"""
+        SELECT sc.match_id, m.match_date, sc.stage_no, sc.shooter_id, sc.place, sc.percentage, sc.points,
+               {", ".join(f"sr.{field}" for field in FIELDS)}
+        FROM stage_results sr
+        JOIN scores sc ON sc.score_id = sr.score_id
+        JOIN matches m ON m.match_id = sc.match_id
+        WHERE sc.stage_no > 0 {season_filter}
+        ORDER BY sc.match_id, sc.stage_no, sc.place
+    """, conn, params=[str(season)] if season else [])
+    frame["match_date"] = pd.to_datetime(frame["match_date"], errors="coerce")
+    frame = frame.astype({"match_id": "int32", "stage_no": "int16", "shooter_id": "int32", "place": "Int16",
+                          "percentage": "float32", "points": "float32", "time": "float32",
+                          "hit_factor": "float32", "penalties": "float32"})
+    frame = frame.astype({field: "Int16" for field in COUNT_FIELDS})
+    return frame.astype({field: "category" for field in TEXT_FIELDS})
+
+
+def hit_rate_by_stage(frame):
+    # Hits over shots per stage, counting only results that say both. Hits are the Hits column where the
+    # page has one, otherwise the scoring zones added up (A+B+C+D)
+    zones = frame[["a", "b", "c", "d"]].sum(axis=1, min_count=1)
+    hits = frame["hits"].fillna(zones)
+    known = hits.notna() & frame["misses"].notna()
+    counted = pd.DataFrame({
+        "match_id": frame["match_id"],
+        "stage_no": frame["stage_no"],
+        "hits": hits,
+        "shots": hits + frame["misses"],
+    })[known]
+    rates = counted.groupby(["match_id", "stage_no"])[["hits", "shots"]].sum()
+    rates["hit_rate"] = rates["hits"] / rates["shots"]
+    return rates.reset_index()
+
+
+def export_parquet(conn, season=None, out_dir=EXPORT_DIR):
+    # One file per season, e.g. exports/stage_results_2025.parquet. Returns the paths written
+    if pyarrow is None:
+        print("⚠️ pyarrow isn't installed (pip install pyarrow), so no Parquet export. "
+              "Everything is still in the stage_results table.")
+        return []
+    frame = load(conn, season)
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    for year, rows in frame.groupby(frame["match_date"].dt.year):
+        path = os.path.join(out_dir, f"stage_results_{int(year)}.parquet")
+        rows.reset_index(drop=True).to_parquet(path, engine="pyarrow", index=False)
+        paths.append(path)
+    return paths
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-stage result detail: hit rates and Parquet export")
+    parser.add_argument("--season", type=int, help="only this year (default: every season)")
+    parser.add_argument("--parquet", action="store_true", help=f"write one Parquet file per season to {EXPORT_DIR}/")
+    parser.add_argument("--db", default=DB_PATH, help="database to read (default: %(default)s)")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    migrations.migrate(conn)
+    frame = load(conn, args.season)
+    print(f"📊 {len(frame)} stage result(s) with detail, {frame['match_id'].nunique()} match(es).")
+    rates = hit_rate_by_stage(frame)
+    if len(rates):
+        print(rates.to_string(index=False, float_format=lambda v: f"{v:.3f}"))
+    if args.parquet:
+        for path in export_parquet(conn, args.season):
+            print(f"✅ Wrote {path}")
+    conn.close()
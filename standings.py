@@ -0,0 +1,63 @@
+import pandas as pd
+
+import migrations
+
+# --- Venue ID to Name Mapping (leaderboard column order) ---
+VENUE_NAMES = {
+    1: "Cheyenne",
+    2: "Laramie",
+    3: "Pawnee",
+    4: "Larkspur",
+    5: "Rawlins"
+}
+
+VENUE_COLUMNS = {vid: f"top_{vname.lower()}" for vid, vname in VENUE_NAMES.items()}
+
+# Active members ranked by WYCO points, with their best Overall % at each venue.
+# Rank is over the full leaderboard, so filtering by class keeps everyone's real rank.
+STANDINGS_QUERY = f"""
+WITH venue_best AS (
+    SELECT sc.shooter_id, m.venue_id, MAX(sc.percentage) AS top_score
+    FROM scores sc
+    JOIN matches m ON sc.match_id = m.match_id
+    WHERE sc.stage_no = 0
+    GROUP BY sc.shooter_id, m.venue_id
+)
+SELECT
+    ROW_NUMBER() OVER (ORDER BY s.wyco_points DESC, s.shooter_id) AS rank,
+    s.shooter_id,
+    s.name AS shooter_name,
+    s.classification,
+    s.wyco_points,
+    {", ".join(f"MAX(CASE WHEN vb.venue_id = {vid} THEN vb.top_score END) AS {col}"
+               for vid, col in VENUE_COLUMNS.items())}
+FROM shooters s
+LEFT JOIN venue_best vb ON vb.shooter_id = s.shooter_id
+WHERE s.wyco_points IS NOT NULL
+AND s.wyco_number IS NOT NULL
+AND s.membership_active = 1
+GROUP BY s.shooter_id
+"""
+
+STANDINGS_COLUMNS = ["rank", "shooter_id", "shooter_name", "classification", "wyco_points"] + list(VENUE_COLUMNS.values())
+
+
+def refresh(conn):
+    # Rebuilt whole after points/classification change: one set-based statement, a few hundred rows
+    with conn:
+        conn.execute("DELETE FROM standings")
+        conn.execute(f"INSERT INTO standings ({', '.join(STANDINGS_COLUMNS)}) {STANDINGS_QUERY}")
+    return conn.execute("SELECT COUNT(*) FROM standings").fetchone()[0]
+
+
+def load(conn, classification=None):
+    class_filter, params = "", []
+    if classification is not None:
+        class_filter, params = "WHERE classification = ?", [classification]
+    # Databases that haven't been migrated (or refreshed) yet get the same rows computed on the fly
+    source = "standings" if migrations.has_rows(conn, "standings") else f"({STANDINGS_QUERY})"
+    return pd.read_sql_query(f"""
+        SELECT {', '.join(STANDINGS_COLUMNS)} FROM {source}
+        {class_filter}
+        ORDER BY rank
+    """, conn, params=params)